@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+# ワーカー間で値を共有できないキャッシュバックエンド
+PER_PROCESS_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """shared キャッシュが全ワーカーで共有されることを確認する
+
+    ワーカー単位のキャッシュではランキングの無効化が他のワーカーに伝わらず、
+    レート制限もワーカー数倍まで緩むため、DEBUG=False ではエラーとして起動を止める。
+    """
+    alias = settings.SHARED_CACHE_ALIAS
+    config = settings.CACHES.get(alias)
+    if config is None:
+        message = f"CACHES['{alias}'] が設定されていません"
+    elif config.get("BACKEND") in PER_PROCESS_CACHE_BACKENDS:
+        message = (
+            f"CACHES['{alias}'] がワーカー単位のキャッシュです: {config.get('BACKEND')}"
+        )
+    else:
+        return []
+
+    hint = "DB / Redis / Memcached など全ワーカーで共有できるバックエンドを指定してください"
+    if settings.DEBUG:
+        return [Warning(message, hint=hint, id="app.W001")]
+    return [Error(message, hint=hint, id="app.E001")]
@@ -0,0 +1,128 @@
+import time
+
+import graphene
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from app.utils.graphql_throttling import RateLimitMiddleware
+
+
+class _LegacyJWTMiddleware:
+    """比較用: 移行前のGraphQLミドルウェアによる認証（全フィールドで呼ばれる）
+
+    認証処理自体は最初の1回のみで、以降は認証済みフラグの確認だけを行う。
+    """
+
+    def resolve(self, next, root, info, **args):
+        try:
+            request = info.context
+            if hasattr(request, "_jwt_authenticated"):
+                return next(root, info, **args)
+            request.user = AnonymousUser()
+            request._jwt_authenticated = True
+        except Exception:
+            pass
+        return next(root, info, **args)
+
+
+class _RowType(graphene.ObjectType):
+    id = graphene.Int()
+    name = graphene.String()
+    gold = graphene.Int()
+    rank = graphene.Int()
+    icon = graphene.String()
+
+
+class _Query(graphene.ObjectType):
+    rows = graphene.List(_RowType, count=graphene.Int())
+
+    def resolve_rows(self, info, count):
+        return [
+            {"id": i, "name": f"user{i}", "gold": 1000 + i, "rank": i + 1, "icon": ""}
+            for i in range(count)
+        ]
+
+
+_QUERY = "query($count: Int) { rows(count: $count) { id name gold rank icon } }"
+
+
+class Command(BaseCommand):
+    help = "GraphQLミドルウェアによるリゾルバーのオーバーヘッドを移行前後で比較する"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=100,
+            help="レスポンスの行数（1行あたり5フィールド）",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=200,
+            help="クエリの実行回数",
+        )
+
+    def _count_resolver_calls(self, schema, rows) -> int:
+        """1リクエストでミドルウェアの resolve が呼ばれる回数を数える"""
+        calls = [0]
+
+        class CountingMiddleware:
+            def resolve(self, next, root, info, **args):
+                calls[0] += 1
+                return next(root, info, **args)
+
+        result = schema.execute(
+            _QUERY,
+            variables={"count": rows},
+            context_value=RequestFactory().post("/graphql/"),
+            middleware=[CountingMiddleware()],
+        )
+        if result.errors:
+            raise RuntimeError(result.errors[0])
+        return calls[0]
+
+    def _measure(self, schema, middleware, rows, iterations) -> float:
+        factory = RequestFactory()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            request = factory.post("/graphql/")
+            request.user = AnonymousUser()
+            schema.execute(
+                _QUERY,
+                variables={"count": rows},
+                context_value=request,
+                middleware=middleware,
+            )
+        elapsed = time.perf_counter() - started
+        return elapsed / iterations * 1000
+
+    def handle(self, *args, **options):
+        schema = graphene.Schema(query=_Query)
+        rows = options["rows"]
+        iterations = options["iterations"]
+
+        cases = [
+            ("ミドルウェアなし", []),
+            (
+                "移行前（JWT + レート制限）",
+                [_LegacyJWTMiddleware(), RateLimitMiddleware()],
+            ),
+            ("移行後（レート制限のみ）", [RateLimitMiddleware()]),
+        ]
+
+        calls = self._count_resolver_calls(schema, rows)
+
+        self.stdout.write(f"レスポンス: {rows}行 x 5フィールド, {iterations}回")
+        self.stdout.write(f"ミドルウェア1つあたりの呼び出し: {calls}回/リクエスト")
+        baseline_ms = None
+        for label, middleware in cases:
+            elapsed_ms = self._measure(schema, middleware, rows, iterations)
+            if baseline_ms is None:
+                baseline_ms = elapsed_ms
+            self.stdout.write(
+                f"{label}: {elapsed_ms:.2f} ms/リクエスト "
+                f"(オーバーヘッド {elapsed_ms - baseline_ms:+.2f} ms)"
+            )
+        self.stdout.write(self.style.SUCCESS("ベンチマーク完了"))
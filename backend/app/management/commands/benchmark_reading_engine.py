@@ -0,0 +1,107 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.models.game import TextPair
+from app.utils.reading_engine import (
+    READING_FEATURE_INDEX,
+    ReadingEngine,
+    tagger_provider,
+)
+
+# DBに文章がない場合に使用するサンプル文章
+SAMPLE_SENTENCES = [
+    "今日は天気が良いので公園を散歩しました。",
+    "新しいプロジェクトの打ち合わせは明日の午後三時からです。",
+    "駅前の本屋で話題の小説を買って帰りました。",
+    "週末は家族と一緒に海へ出かける予定です。",
+    "毎朝コーヒーを飲みながらニュースを確認しています。",
+]
+
+
+def _legacy_to_hiragana(mecab, kanji_text):
+    """比較用: 共通化前の変換処理（テキスト出力を再パースし、1文字ずつ連結）"""
+    lines = mecab.parse(kanji_text).strip().split("\n")
+    hiragana_parts = []
+    for line in lines:
+        if line == "EOS" or not line.strip():
+            break
+        parts = line.split("\t")
+        if len(parts) >= 2:
+            features = parts[1].split(",")
+            if (
+                len(features) > READING_FEATURE_INDEX
+                and features[READING_FEATURE_INDEX] != "*"
+            ):
+                hiragana_text = ""
+                for char in features[READING_FEATURE_INDEX]:
+                    if "ァ" <= char <= "ヶ":
+                        hiragana_text += chr(ord(char) - ord("ァ") + ord("ぁ"))
+                    else:
+                        hiragana_text += char
+                hiragana_parts.append(hiragana_text)
+            else:
+                hiragana_parts.append(parts[0])
+    return "".join(hiragana_parts)
+
+
+class Command(BaseCommand):
+    help = "ひらがな変換（ReadingEngine）の1文あたりの処理時間を旧実装と比較する"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="サンプル文章全体を変換する回数",
+        )
+        parser.add_argument(
+            "--sample-size",
+            type=int,
+            default=200,
+            help="DBから取得するサンプル文章の件数",
+        )
+
+    def _measure(self, convert, sentences, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for sentence in sentences:
+                convert(sentence)
+        elapsed = time.perf_counter() - started
+        return elapsed / (iterations * len(sentences)) * 1_000_000
+
+    def handle(self, *args, **options):
+        mecab = tagger_provider.get()
+        if mecab is None:
+            self.stdout.write(self.style.ERROR("MeCabの初期化に失敗しました"))
+            return
+
+        sentences = (
+            list(
+                TextPair.objects.values_list("kanji", flat=True)[
+                    : options["sample_size"]
+                ]
+            )
+            or SAMPLE_SENTENCES
+        )
+        engine = ReadingEngine(mecab)
+        iterations = options["iterations"]
+
+        mismatches = sum(
+            1
+            for sentence in sentences
+            if engine.to_hiragana(sentence) != _legacy_to_hiragana(mecab, sentence)
+        )
+
+        legacy_us = self._measure(
+            lambda sentence: _legacy_to_hiragana(mecab, sentence), sentences, iterations
+        )
+        engine_us = self._measure(engine.to_hiragana, sentences, iterations)
+
+        self.stdout.write(f"サンプル文章: {len(sentences)}件 x {iterations}回")
+        self.stdout.write(f"旧実装: {legacy_us:.1f} µs/文")
+        self.stdout.write(f"ReadingEngine: {engine_us:.1f} µs/文")
+        self.stdout.write(f"読みキャッシュ: {ReadingEngine.cache_info()}")
+        if mismatches:
+            self.stdout.write(self.style.WARNING(f"変換結果の不一致: {mismatches}件"))
+        self.stdout.write(self.style.SUCCESS("ベンチマーク完了"))
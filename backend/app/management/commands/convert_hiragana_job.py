@@ -1,10 +1,15 @@
 import logging
 
-import MeCab
 from django.core.management.base import BaseCommand
-from django.db import transaction
 
 from app.models.game import TextPair
+from app.utils.constants import TextConversionConstants
+from app.utils.job_runs import current_job_run, record_job_run
+from app.utils.reading_engine import tagger_provider
+from app.utils.text_conversion import (
+    convert_unconverted_text_pairs,
+    convert_unconverted_text_pairs_parallel,
+)
 
 logger = logging.getLogger("app")
 
@@ -12,109 +17,67 @@ logger = logging.getLogger("app")
 class Command(BaseCommand):
     help = "変換フラグが0のkanjiカラムの文章をMeCabでひらがな化し、変換フラグを1にするジョブ"
 
-    def _katakana_to_hiragana(self, katakana_text):
-        """カタカナをひらがなに変換するヘルパーメソッド"""
-        hiragana_text = ""
-        for char in katakana_text:
-            if "ァ" <= char <= "ヶ":
-                # カタカナをひらがなに変換
-                hiragana_text += chr(ord(char) - ord("ァ") + ord("ぁ"))
-            else:
-                hiragana_text += char
-        return hiragana_text
-
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=TextConversionConstants.CHUNK_SIZE,
+            help="1回の読み込み・コミットで変換する件数",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="変換に使用するプロセス数（2以上で並列変換）",
+        )
+
+    @record_job_run("convert_hiragana_job")
     def handle(self, *args, **options):
         """
         ひらがな変換ジョブの実行
-        10分に1回 (5,15,25,35,45,55分) で動作
+        1時間に1回 (毎時5分) で動作
+        通常は generate_text_job --pipeline が変換済みで保存するため、
+        生成時に変換できなかった文章の補完として使用する
         """
+        job_run = current_job_run()
         self.stdout.write(self.style.SUCCESS("ひらがな変換ジョブを開始します"))
         logger.info("ひらがな変換ジョブ開始")
 
         try:
-            # MeCabの初期化（複数の設定を試行）
-            mecab = None
-            mecab_available = False
-
-            for tagger_option in [
-                "",
-                "-Owakati",
-                "-d /usr/lib/mecab/dic/ipadic",
-                "-d /var/lib/mecab/dic/ipadic",
-            ]:
-                try:
-                    logger.info(f"MeCab初期化試行: {tagger_option or 'デフォルト'}")
-                    mecab = MeCab.Tagger(tagger_option)
-                    mecab_available = True
-                    logger.info(f"MeCab初期化成功: {tagger_option or 'デフォルト'}")
-                    break
-                except RuntimeError as e:
-                    logger.warning(
-                        f"MeCab初期化失敗: {tagger_option or 'デフォルト'} - {str(e)}"
-                    )
-                    continue
+            # MeCabの初期化（プロセス内で1度だけ。成功した設定を優先して試行）
+            engine = tagger_provider.engine()
+            mecab_available = engine is not None
 
             if not mecab_available:
                 logger.error("MeCabの初期化に失敗しました。")
+                job_run.fail("MeCabの初期化に失敗しました")
                 self.stdout.write(
                     self.style.ERROR("ジョブ失敗: MeCabの初期化に失敗しました")
                 )
                 return
 
-            # 未変換の文章を取得
-            unconverted_pairs = TextPair.objects.filter(is_converted=False)
-
-            if not unconverted_pairs.exists():
+            # 未変換の文章が存在するか確認
+            if not TextPair.objects.filter(TextPair.pending_conversion()).exists():
                 logger.info("変換対象の文章が見つかりませんでした")
                 self.stdout.write(self.style.WARNING("変換対象の文章がありません"))
                 return
 
-            converted_count = 0
-
-            with transaction.atomic():
-                for text_pair in unconverted_pairs:
-                    try:
-                        # MeCabで形態素解析
-                        parsed = mecab.parse(text_pair.kanji)
-                        lines = parsed.strip().split("\n")
-
-                        # ひらがな部分を抽出
-                        hiragana_parts = []
-                        for line in lines:
-                            if line == "EOS" or not line.strip():
-                                break
-                            parts = line.split("\t")
-                            if len(parts) >= 2:
-                                # 表層形（単語）
-                                surface = parts[0]
-                                # 品詞情報をカンマで分割
-                                features = parts[1].split(",")
-
-                                # 読み仮名はカンマ区切りの8番目（インデックス7）
-                                if len(features) >= 8 and features[7] != "*":
-                                    # カタカナをひらがなに変換
-                                    katakana_reading = features[7]
-                                    hiragana_reading = self._katakana_to_hiragana(
-                                        katakana_reading
-                                    )
-                                    hiragana_parts.append(hiragana_reading)
-                                else:
-                                    # 読み仮名がない場合は表層形をそのまま使用
-                                    hiragana_parts.append(surface)
-
-                        # ひらがな文章を作成
-                        hiragana_text = "".join(hiragana_parts)
-
-                        # データベースを更新
-                        text_pair.hiragana = hiragana_text
-                        text_pair.is_converted = True
-                        text_pair.save()
-
-                        converted_count += 1
-
-                    except Exception as e:
-                        logger.error(f"個別変換エラー (ID: {text_pair.id}): {str(e)}")
-                        continue
+            # チャンク単位で変換・一括更新（チャンクごとにコミット）
+            if options["workers"] > 1:
+                # 子プロセスごとにTaggerを初期化し、親プロセスが書き込みを担当
+                logger.info(f"並列変換モード: workers={options['workers']}")
+                converted_count, failed_count = convert_unconverted_text_pairs_parallel(
+                    workers=options["workers"],
+                    chunk_size=options["chunk_size"],
+                )
+            else:
+                converted_count, failed_count = convert_unconverted_text_pairs(
+                    engine.to_hiragana,
+                    chunk_size=options["chunk_size"],
+                )
+            job_run.add_rows(converted_count)
+            if failed_count:
+                logger.warning(f"ひらがな変換エラー: {failed_count}件")
 
             logger.info(f"ひらがな変換ジョブ完了: {converted_count}件変換")
             self.stdout.write(
@@ -125,4 +88,5 @@ class Command(BaseCommand):
 
         except Exception as e:
             logger.error(f"ひらがな変換ジョブエラー: {str(e)}", exc_info=True)
+            job_run.fail(str(e))
             self.stdout.write(self.style.ERROR(f"ジョブエラー: {str(e)}"))
@@ -2,6 +2,9 @@ import logging
 
 from django.core.management.base import BaseCommand
 
+from app.utils.job_runs import current_job_run, record_job_run
+from app.utils.reading_engine import tagger_provider
+from app.utils.stub_text_model import StubGenerativeModel
 from app.views.game.textgenerator import TextGenerator
 
 logger = logging.getLogger("app")
@@ -10,32 +13,87 @@ logger = logging.getLogger("app")
 class Command(BaseCommand):
     help = "AIAPIを使用して漢字を含む文章を100文生成し、テーブルのkanjiカラムに格納するジョブ"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrent",
+            action="store_true",
+            help="複数のプロンプトを並列でAIに送信する",
+        )
+        parser.add_argument(
+            "--prompts",
+            type=int,
+            default=None,
+            help="並列生成時のプロンプト数（未指定時は TEXT_GENERATION_PROMPT_COUNT）",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="並列生成時の同時リクエスト数（未指定時は TEXT_GENERATION_CONCURRENCY）",
+        )
+        parser.add_argument(
+            "--pipeline",
+            action="store_true",
+            help="生成した文章をその場でひらがな化し、変換済みとして保存する",
+        )
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="外部APIを呼ばずにスタブモデルで生成する（動作確認用）",
+        )
+
+    @record_job_run("generate_text_job")
     def handle(self, *args, **options):
         """
         AIAPIジョブの実行
         10分に1回 (0,10,20,30,40,50分) で動作
         """
+        job_run = current_job_run()
         self.stdout.write(self.style.SUCCESS("AIテキスト生成ジョブを開始します"))
         logger.info("AIテキスト生成ジョブ開始")
 
         try:
             # TextGeneratorを使用して文章生成
-            generator = TextGenerator()
-            result = generator.generate_text()
+            convert = None
+            if options["pipeline"]:
+                # 変換ジョブを待たずに配信できるよう、保存前にひらがな化する
+                engine = tagger_provider.engine()
+                if engine is not None:
+                    convert = engine.to_hiragana
+                else:
+                    logger.warning(
+                        "MeCabを初期化できないため未変換のまま保存します（変換ジョブで補完）"
+                    )
+
+            model = StubGenerativeModel() if options["offline"] else None
+            generator = TextGenerator(model=model)
+            if options["concurrent"]:
+                result = generator.generate_text_concurrently(
+                    prompt_count=options["prompts"],
+                    concurrency=options["concurrency"],
+                    convert=convert,
+                )
+            else:
+                result = generator.generate_text(convert=convert)
 
             if "error" in result:
                 logger.error(f"AIテキスト生成ジョブ失敗: {result['error']}")
+                job_run.fail(result["error"])
                 self.stdout.write(self.style.ERROR(f"ジョブ失敗: {result['error']}"))
                 return
 
             if "sentences" not in result:
                 logger.error("sentencesフィールドが見つかりません")
+                job_run.fail("sentencesフィールドが見つかりません")
                 self.stdout.write(
                     self.style.ERROR("ジョブ失敗: sentencesフィールドが見つかりません")
                 )
                 return
 
             sentences_count = len(result["sentences"])
+            job_run.add_rows(sentences_count)
+            if result.get("failed_prompts"):
+                logger.warning(f"失敗したプロンプト: {result['failed_prompts']}件")
             logger.info(f"AIテキスト生成ジョブ完了: {sentences_count}件生成")
             self.stdout.write(
                 self.style.SUCCESS(
@@ -45,4 +103,5 @@ class Command(BaseCommand):
 
         except Exception as e:
             logger.error(f"AIテキスト生成ジョブエラー: {str(e)}", exc_info=True)
+            job_run.fail(str(e))
             self.stdout.write(self.style.ERROR(f"ジョブエラー: {str(e)}"))
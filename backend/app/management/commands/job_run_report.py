@@ -0,0 +1,95 @@
+import math
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.models import JobRun
+from app.utils.constants import JobRunConstants
+
+# 所要時間の集計で表示するパーセンタイル
+PERCENTILES = (50, 90, 99)
+
+
+def _percentile(sorted_values: list[float], percentile: int) -> float:
+    """ソート済みの値から最近接順位法でパーセンタイルを求める"""
+    rank = math.ceil(percentile / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "ジョブ実行履歴から、ジョブごとの所要時間のパーセンタイルと処理件数を集計する"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=JobRunConstants.REPORT_WINDOW_HOURS,
+            help="集計期間（直近の時間数）",
+        )
+        parser.add_argument(
+            "--job",
+            type=str,
+            default=None,
+            help="集計対象のジョブ名（未指定時は全ジョブ）",
+        )
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options["hours"])
+        runs = JobRun.objects.filter(started_at__gte=since)
+        if options["job"]:
+            runs = runs.filter(job_name=options["job"])
+
+        by_job = {}
+        for job_name, status, duration, rows in runs.values_list(
+            "job_name", "status", "duration_seconds", "rows_processed"
+        ).order_by("job_name"):
+            by_job.setdefault(job_name, []).append((status, duration, rows))
+
+        self.stdout.write(f"集計期間: 直近{options['hours']}時間")
+        if not by_job:
+            self.stdout.write(self.style.WARNING("実行履歴がありません"))
+            return
+
+        for job_name, job_runs in by_job.items():
+            status_counts = {}
+            for status, _, _ in job_runs:
+                status_counts[status] = status_counts.get(status, 0) + 1
+
+            # 所要時間・処理件数は完了した実行のみで集計する
+            finished = [
+                (duration, rows)
+                for status, duration, rows in job_runs
+                if status == JobRunConstants.STATUS_SUCCEEDED and duration is not None
+            ]
+            durations = sorted(duration for duration, _ in finished)
+            total_rows = sum(rows for _, rows in finished)
+            total_seconds = sum(durations)
+
+            self.stdout.write(self.style.SUCCESS(f"\n[{job_name}]"))
+            self.stdout.write(
+                "  実行回数: "
+                + ", ".join(
+                    f"{status}={count}"
+                    for status, count in sorted(status_counts.items())
+                )
+            )
+            if not durations:
+                self.stdout.write("  成功した実行がありません")
+                continue
+
+            self.stdout.write(
+                "  所要時間: "
+                + ", ".join(
+                    f"p{percentile}={_percentile(durations, percentile):.2f}秒"
+                    for percentile in PERCENTILES
+                )
+                + f", max={durations[-1]:.2f}秒"
+            )
+            throughput = total_rows / total_seconds if total_seconds > 0 else 0.0
+            self.stdout.write(
+                f"  処理件数: 合計{total_rows}件, 1回平均{total_rows / len(durations):.1f}件, "
+                f"{throughput:.1f}件/秒"
+            )
@@ -0,0 +1,28 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.utils.reading_engine import tagger_provider
+
+# 変換時間の計測に使用する文章
+HEALTH_CHECK_SENTENCE = "今日は天気が良いので公園を散歩しました。"
+
+
+class Command(BaseCommand):
+    help = "共有MeCab.Taggerの初期化状態と変換時間を表示する"
+
+    def handle(self, *args, **options):
+        engine = tagger_provider.engine()
+        report = tagger_provider.report()
+
+        if engine is not None:
+            started = time.perf_counter()
+            report["sample_reading"] = engine.to_hiragana(HEALTH_CHECK_SENTENCE)
+            report["sample_seconds"] = time.perf_counter() - started
+
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        if engine is None:
+            self.stdout.write(self.style.ERROR("MeCabの初期化に失敗しました"))
+        else:
+            self.stdout.write(self.style.SUCCESS("MeCabは利用可能です"))
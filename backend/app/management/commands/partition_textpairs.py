@@ -4,6 +4,8 @@ from datetime import datetime, timedelta
 from django.core.management.base import BaseCommand
 from django.db import connection
 
+from app.utils.job_runs import current_job_run, record_job_run
+
 logger = logging.getLogger("app")
 
 
@@ -126,8 +128,10 @@ class Command(BaseCommand):
             self.stdout.write(f"削除したパーティション数: {deleted_count}")
             return deleted_count
 
+    @record_job_run("partition_textpairs")
     def handle(self, *args, **options):
         """パーティション管理ジョブの実行"""
+        job_run = current_job_run()
         self.stdout.write(
             self.style.SUCCESS("textpairsパーティション管理ジョブを開始します")
         )
@@ -139,12 +143,17 @@ class Command(BaseCommand):
                 today = datetime.now().date()
                 tomorrow = today + timedelta(days=1)
 
-                self.create_partition_for_date(today)
-                self.create_partition_for_date(tomorrow)
+                created_count = sum(
+                    1
+                    for date in (today, tomorrow)
+                    if self.create_partition_for_date(date)
+                )
+                job_run.add_rows(created_count)
 
             if options["all"] or options["cleanup_old_partitions"]:
                 # 古いパーティションをクリーンアップ
                 deleted_count = self.cleanup_old_partitions()
+                job_run.add_rows(deleted_count)
 
             self.stdout.write(
                 self.style.SUCCESS("パーティション管理ジョブが完了しました")
@@ -153,4 +162,5 @@ class Command(BaseCommand):
 
         except Exception as e:
             logger.error(f"パーティション管理ジョブエラー: {str(e)}", exc_info=True)
+            job_run.fail(str(e))
             self.stdout.write(self.style.ERROR(f"ジョブエラー: {str(e)}"))
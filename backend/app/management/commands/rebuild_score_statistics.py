@@ -0,0 +1,45 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.models import ScoreStatistics
+
+logger = logging.getLogger("app")
+
+
+class Command(BaseCommand):
+    help = "gamesテーブルからスコア統計（件数・平均・分散・中央値スケッチ）を再構築するジョブ"
+
+    def handle(self, *args, **options):
+        """
+        スコア統計の再構築
+        ゲーム削除などで逐次集計とずれた場合の再同期に使用する
+        """
+        self.stdout.write(self.style.SUCCESS("スコア統計再構築ジョブを開始します"))
+        logger.info("スコア統計再構築ジョブ開始")
+
+        try:
+            with transaction.atomic():
+                # 再構築中のスコア反映を待たせるため先に全シャードの行ロックを取得
+                list(
+                    ScoreStatistics.objects.select_for_update().filter(
+                        key__in=ScoreStatistics.shard_keys()
+                    )
+                )
+                distribution = ScoreStatistics.rebuild()
+
+            logger.info(
+                f"スコア統計再構築ジョブ完了: count={distribution.count}, "
+                f"median={distribution.median()}, std_dev={distribution.std_dev()}"
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"ジョブ完了: {distribution.count}件のスコアを集計しました"
+                )
+            )
+
+        except Exception as e:
+            logger.error(f"スコア統計再構築ジョブエラー: {str(e)}", exc_info=True)
+            # 失敗を終了コードとジョブ履歴に反映するため送出する
+            raise CommandError(f"ジョブエラー: {str(e)}") from e
@@ -0,0 +1,51 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.models import RankingIndexNode, User
+from app.utils.constants import RankingConstants
+
+logger = logging.getLogger("app")
+
+
+class Command(BaseCommand):
+    help = "RANK() OVER (ORDER BY gold DESC) で全ユーザーのランキングを一括再計算するジョブ"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RankingConstants.RECOMPUTE_BATCH_SIZE,
+            help="1トランザクションあたりに更新するランキング件数",
+        )
+        parser.add_argument(
+            "--rebuild-index",
+            action="store_true",
+            help="順位インデックス（Fenwick木）もusersテーブルから再構築する",
+        )
+
+    def handle(self, *args, **options):
+        """ランキング一括再計算ジョブの実行"""
+        self.stdout.write(self.style.SUCCESS("ランキング一括再計算ジョブを開始します"))
+        logger.info("ランキング一括再計算ジョブ開始")
+
+        try:
+            if options["rebuild_index"]:
+                with transaction.atomic():
+                    user_count = RankingIndexNode.rebuild()
+                logger.info(f"順位インデックス再構築完了: users={user_count}")
+                self.stdout.write(f"順位インデックスを再構築しました: {user_count}件")
+
+            updated_count = User.update_rankings(batch_size=options["batch_size"])
+
+            logger.info(f"ランキング一括再計算ジョブ完了: {updated_count}件更新")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"ジョブ完了: {updated_count}件のランキングを更新しました"
+                )
+            )
+
+        except Exception as e:
+            logger.error(f"ランキング一括再計算ジョブエラー: {str(e)}", exc_info=True)
+            self.stdout.write(self.style.ERROR(f"ジョブエラー: {str(e)}"))
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.2 on 2026-10-17 22:26
+
+from django.db import migrations, models
+
+
+def populate_score_statistics(apps, schema_editor):
+    from app.utils.score_distribution import ScoreDistribution
+
+    Game = apps.get_model('app', 'Game')
+    ScoreStatistics = apps.get_model('app', 'ScoreStatistics')
+
+    scores = (
+        Game.objects.filter(score__gt=0)
+        .values_list('score', flat=True)
+        .iterator(chunk_size=5000)
+    )
+    distribution = ScoreDistribution.from_scores(scores)
+    ScoreStatistics.objects.update_or_create(
+        key='global',
+        defaults={
+            'count': distribution.count,
+            'mean': distribution.mean,
+            'm2': distribution.m2,
+            'bucket_width': distribution.bucket_width,
+            'histogram': distribution.to_dict()['histogram'],
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_alter_emailverification_id_alter_game_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreStatistics',
+            fields=[
+                ('key', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('count', models.BigIntegerField(default=0)),
+                ('mean', models.FloatField(default=0.0)),
+                ('m2', models.FloatField(default=0.0)),
+                ('bucket_width', models.IntegerField(default=10)),
+                ('histogram', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'score_statistics',
+            },
+        ),
+        migrations.RunPython(populate_score_statistics, migrations.RunPython.noop),
+    ]
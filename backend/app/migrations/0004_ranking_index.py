@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-17 22:28
+
+from django.db import migrations, models
+
+
+def populate_ranking_index(apps, schema_editor):
+    from app.models.ranking_index import RankingIndexNode
+
+    User = apps.get_model('app', 'User')
+    RankingIndexNode.rebuild(user_model=User)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_score_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingIndexNode',
+            fields=[
+                ('node', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('user_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'ranking_index_nodes',
+            },
+        ),
+        migrations.RunPython(populate_ranking_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-17 22:38
+
+from django.db import migrations, models
+
+
+def populate_content_hash(apps, schema_editor):
+    from app.utils.text_ingestion import content_hash
+
+    TextPair = apps.get_model('app', 'TextPair')
+
+    batch = []
+    for text_pair in TextPair.objects.only('id', 'kanji').iterator(chunk_size=1000):
+        text_pair.content_hash = content_hash(text_pair.kanji)
+        batch.append(text_pair)
+        if len(batch) >= 1000:
+            TextPair.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    if batch:
+        TextPair.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_user_gold_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='textpair',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='正規化した漢字文章のハッシュ'),
+        ),
+        migrations.AddIndex(
+            model_name='textpair',
+            index=models.Index(fields=['content_hash'], name='idx_textpair_content_hash'),
+        ),
+        migrations.RunPython(populate_content_hash, migrations.RunPython.noop),
+    ]
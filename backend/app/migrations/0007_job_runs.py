@@ -0,0 +1,32 @@
+# Generated by Django 5.0.2 on 2026-10-17 22:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_textpair_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_name', models.CharField(max_length=64)),
+                ('source', models.CharField(default='command', max_length=16)),
+                ('status', models.CharField(default='running', max_length=16)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('rows_processed', models.IntegerField(default=0)),
+                ('error_message', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'db_table': 'job_runs',
+                'indexes': [models.Index(fields=['job_name', 'started_at'], name='idx_jobrun_job_started'), models.Index(fields=['started_at'], name='idx_jobrun_started')],
+            },
+        ),
+    ]
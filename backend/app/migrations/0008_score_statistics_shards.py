@@ -0,0 +1,30 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:12
+
+from django.db import migrations
+
+# スコア登録時の行ロック競合を避けるための分散行数（作成時点の値）
+SHARD_COUNT = 16
+
+
+def create_score_statistics_shards(apps, schema_editor):
+    ScoreStatistics = apps.get_model('app', 'ScoreStatistics')
+    for index in range(1, SHARD_COUNT):
+        ScoreStatistics.objects.get_or_create(key=f'global:{index}')
+
+
+def delete_score_statistics_shards(apps, schema_editor):
+    ScoreStatistics = apps.get_model('app', 'ScoreStatistics')
+    ScoreStatistics.objects.filter(key__startswith='global:').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_job_runs'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_score_statistics_shards, delete_score_statistics_shards
+        ),
+    ]
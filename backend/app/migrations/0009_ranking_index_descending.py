@@ -0,0 +1,58 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:40
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+# 変更前: ノード番号 = gold + 1、木のサイズ 2^31（根ノードに全更新が集中する）
+ASCENDING_TREE_SIZE = 1 << 31
+# 変更後: ノード番号 = サイズ - gold、木のサイズ 2^32-1（根ノードなし）
+DESCENDING_TREE_SIZE = (1 << 32) - 1
+
+
+def _rebuild(apps, index_of, tree_size):
+    # 現在のモデルやヘルパーに依存しないよう、構築処理をここに持つ
+    User = apps.get_model('app', 'User')
+    RankingIndexNode = apps.get_model('app', 'RankingIndexNode')
+
+    counts = (
+        User.objects.filter(is_active=True, gold__isnull=False)
+        .values('gold')
+        .annotate(user_count=models.Count('id'))
+        .values_list('gold', 'user_count')
+    )
+    nodes = defaultdict(int)
+    for gold, user_count in counts:
+        node = index_of(max(gold, 0))
+        while node <= tree_size:
+            nodes[node] += user_count
+            node += node & -node
+
+    RankingIndexNode.objects.all().delete()
+    RankingIndexNode.objects.bulk_create(
+        [
+            RankingIndexNode(node=node, user_count=user_count)
+            for node, user_count in nodes.items()
+            if user_count
+        ],
+        batch_size=1000,
+    )
+
+
+def rebuild_descending(apps, schema_editor):
+    _rebuild(apps, lambda gold: DESCENDING_TREE_SIZE - gold, DESCENDING_TREE_SIZE)
+
+
+def rebuild_ascending(apps, schema_editor):
+    _rebuild(apps, lambda gold: gold + 1, ASCENDING_TREE_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_score_statistics_shards'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_descending, rebuild_ascending),
+    ]
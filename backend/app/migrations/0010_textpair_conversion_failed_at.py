@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-17 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_ranking_index_descending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='textpair',
+            name='conversion_failed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='ひらがな変換の失敗日時'),
+        ),
+    ]
@@ -1,7 +1,19 @@
 from .game import Game
 from .ranking import Ranking
+from .ranking_index import RankingIndexNode
 from .user import User
 from .email_verification import EmailVerification
 from .password_reset import PasswordReset
+from .score_statistics import ScoreStatistics
+from .job_run import JobRun
 
-__all__ = ["User", "Game", "Ranking", "EmailVerification", "PasswordReset"]
+__all__ = [
+    "User",
+    "Game",
+    "Ranking",
+    "RankingIndexNode",
+    "EmailVerification",
+    "PasswordReset",
+    "ScoreStatistics",
+    "JobRun",
+]
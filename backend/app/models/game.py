@@ -1,8 +1,15 @@
 import uuid
 
+from datetime import timedelta
+
 from django.db import models
+from django.utils import timezone
 
-from app.utils.constants import ModelConstants
+from app.utils.constants import (
+    ModelConstants,
+    TextConversionConstants,
+    TextIngestionConstants,
+)
 
 from .user import User
 
@@ -62,6 +69,15 @@ class TextPair(models.Model):
     kanji = models.TextField(verbose_name="漢字文章")
     hiragana = models.TextField(blank=True, null=True, verbose_name="ひらがな文章")
     is_converted = models.BooleanField(default=False, verbose_name="ひらがな変換フラグ")
+    content_hash = models.CharField(
+        max_length=TextIngestionConstants.CONTENT_HASH_LENGTH,
+        blank=True,
+        null=True,
+        verbose_name="正規化した漢字文章のハッシュ",
+    )
+    conversion_failed_at = models.DateTimeField(
+        blank=True, null=True, verbose_name="ひらがな変換の失敗日時"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -72,7 +88,23 @@ class TextPair(models.Model):
         indexes = [
             models.Index(fields=["is_converted"], name="idx_textpair_converted"),
             models.Index(fields=["created_at"], name="idx_textpair_created"),
+            models.Index(fields=["content_hash"], name="idx_textpair_content_hash"),
         ]
 
+    @staticmethod
+    def pending_conversion() -> models.Q:
+        """変換対象とする未変換行の条件
+
+        直近に変換に失敗した行は FAILURE_BACKOFF_SECONDS の間除外し、
+        恒久的に変換できない行が毎回のジョブで再試行されないようにする。
+        """
+        retry_before = timezone.now() - timedelta(
+            seconds=TextConversionConstants.FAILURE_BACKOFF_SECONDS
+        )
+        return models.Q(is_converted=False) & (
+            models.Q(conversion_failed_at__isnull=True)
+            | models.Q(conversion_failed_at__lt=retry_before)
+        )
+
     def __str__(self):
         return f"TextPair {self.id}: {self.kanji[:20]}..."
@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+from app.utils.constants import JobRunConstants
+
+
+class JobRun(models.Model):
+    """定期ジョブ（管理コマンド）の実行履歴モデル
+
+    所要時間・処理件数・終了ステータスを記録し、job_run_report で集計する。
+    """
+
+    job_name = models.CharField(max_length=JobRunConstants.MAX_JOB_NAME_LENGTH)
+    source = models.CharField(
+        max_length=JobRunConstants.MAX_STATUS_LENGTH,
+        default=JobRunConstants.SOURCE_COMMAND,
+    )
+    status = models.CharField(
+        max_length=JobRunConstants.MAX_STATUS_LENGTH,
+        default=JobRunConstants.STATUS_RUNNING,
+    )
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    duration_seconds = models.FloatField(blank=True, null=True)
+    rows_processed = models.IntegerField(default=0)
+    error_message = models.TextField(blank=True, default="")
+
+    class Meta:
+        db_table = "job_runs"
+        indexes = [
+            models.Index(
+                fields=["job_name", "started_at"], name="idx_jobrun_job_started"
+            ),
+            models.Index(fields=["started_at"], name="idx_jobrun_started"),
+        ]
+
+    def __str__(self):
+        return f"JobRun {self.job_name}: {self.status} ({self.started_at})"
@@ -0,0 +1,134 @@
+from collections import defaultdict
+
+from django.db import connection, models
+
+from app.utils.constants import RankingConstants
+
+
+class RankingIndexNode(models.Model):
+    """ゴールド別ユーザー数を保持するFenwick木（Binary Indexed Tree）のノード
+
+    - ノード番号はゴールドの降順（index = INDEX_TREE_SIZE - gold）に対応し、
+      件数0のノードは保持しない（疎）
+    - 1回のゴールド変動で更新されるのは O(log G) 個のノードのみで、
+      他ユーザーのランキング行は書き換えない
+    - 木のサイズを 2^32-1（2の累乗でない）とし降順で割り当てることで、
+      gold のユーザーが更新するノードは gold+1 件以下の範囲しか持たない。
+      全体の件数を持つ根ノードが存在しないため、ゴールド帯の離れたユーザー同士で
+      同じ行を更新することはない
+    - 対象はアクティブかつ gold が NULL でないユーザー
+    """
+
+    node = models.BigIntegerField(primary_key=True)
+    user_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "ranking_index_nodes"
+
+    def __str__(self):
+        return f"RankingIndexNode {self.node}: {self.user_count}"
+
+    @staticmethod
+    def _index(gold: int) -> int:
+        """gold に対応するノード番号（ゴールドが多いほど小さい）"""
+        return RankingConstants.INDEX_TREE_SIZE - max(gold, 0)
+
+    @staticmethod
+    def _update_path(index: int) -> list[int]:
+        """index の件数を更新する際に影響するノード一覧"""
+        path = []
+        node = index
+        while node <= RankingConstants.INDEX_TREE_SIZE:
+            path.append(node)
+            node += node & -node
+        return path
+
+    @staticmethod
+    def _prefix_path(index: int) -> list[int]:
+        """index 以下（= 対応するゴールド以上）の件数を求める際に参照するノード一覧"""
+        path = []
+        node = min(index, RankingConstants.INDEX_TREE_SIZE)
+        while node > 0:
+            path.append(node)
+            node -= node & -node
+        return path
+
+    @classmethod
+    def apply_deltas(cls, deltas: dict[int, int]) -> None:
+        """ゴールド別の増減をFenwick木に反映する
+
+        Args:
+            deltas: {gold: 増減数}
+        """
+        node_deltas = defaultdict(int)
+        for gold, delta in deltas.items():
+            if gold is None or delta == 0:
+                continue
+            for node in cls._update_path(cls._index(gold)):
+                node_deltas[node] += delta
+
+        # ノード番号の昇順で更新し、同時更新時のロック順序を揃える
+        rows = sorted((node, delta) for node, delta in node_deltas.items() if delta)
+        for start in range(0, len(rows), RankingConstants.INDEX_WRITE_CHUNK_SIZE):
+            cls._upsert(rows[start : start + RankingConstants.INDEX_WRITE_CHUNK_SIZE])
+
+    @classmethod
+    def _upsert(cls, rows: list[tuple[int, int]]) -> None:
+        if not rows:
+            return
+        table = connection.ops.quote_name(cls._meta.db_table)
+        placeholders = ", ".join(["(%s, %s)"] * len(rows))
+        params = [value for row in rows for value in row]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (node, user_count) VALUES {placeholders}
+                ON CONFLICT (node) DO UPDATE
+                SET user_count = {table}.user_count + EXCLUDED.user_count
+                """,
+                params,
+            )
+
+    @classmethod
+    def _fetch_nodes(cls, nodes) -> dict[int, int]:
+        return dict(
+            cls.objects.filter(node__in=set(nodes)).values_list("node", "user_count")
+        )
+
+    @classmethod
+    def ranks_of(cls, golds: list[int]) -> list[int]:
+        """各ゴールドの順位（自分より多いユーザー数 + 1）を1クエリで求める"""
+        # 自分より多い = ノード番号が自分より小さい
+        paths = [cls._prefix_path(cls._index(gold) - 1) for gold in golds]
+        values = cls._fetch_nodes([node for path in paths for node in path])
+        return [sum(values.get(node, 0) for node in path) + 1 for path in paths]
+
+    @classmethod
+    def rank_of(cls, gold: int) -> int:
+        """ゴールドの順位を求める"""
+        return cls.ranks_of([gold])[0]
+
+    @classmethod
+    def total_users(cls) -> int:
+        path = cls._prefix_path(RankingConstants.INDEX_TREE_SIZE)
+        values = cls._fetch_nodes(path)
+        return sum(values.get(node, 0) for node in path)
+
+    @classmethod
+    def rebuild(cls, user_model=None) -> int:
+        """usersテーブルからFenwick木を再構築する"""
+        if user_model is None:
+            from .user import User
+
+            user_model = User
+
+        counts = (
+            user_model.objects.filter(is_active=True, gold__isnull=False)
+            .values("gold")
+            .annotate(user_count=models.Count("id"))
+            .values_list("gold", "user_count")
+        )
+        cls.objects.all().delete()
+        deltas = dict(counts)
+        cls.apply_deltas(deltas)
+        return sum(deltas.values())
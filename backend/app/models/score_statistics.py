@@ -0,0 +1,127 @@
+import logging
+import random
+
+from django.db import models
+
+from app.utils.constants import ScoreStatisticsConstants
+from app.utils.score_distribution import ScoreDistribution
+
+logger = logging.getLogger("app")
+
+
+class ScoreStatistics(models.Model):
+    """完了済みゲームのスコア分布を保持する集計モデル
+
+    ゲーム完了時に逐次更新し、Zスコア計算時に全スコアを読み込まずに済むようにする。
+    スコア登録が1行の行ロックで直列化されないよう、SHARD_COUNT 行に分散して
+    記録し、参照時に結合する（ScoreDistribution.merge）。
+    """
+
+    key = models.CharField(max_length=32, primary_key=True)
+    count = models.BigIntegerField(default=0)
+    mean = models.FloatField(default=0.0)
+    m2 = models.FloatField(default=0.0)
+    bucket_width = models.IntegerField(
+        default=ScoreStatisticsConstants.HISTOGRAM_BUCKET_WIDTH
+    )
+    histogram = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "score_statistics"
+
+    def __str__(self):
+        return f"ScoreStatistics {self.key}: count={self.count}"
+
+    def to_distribution(self) -> ScoreDistribution:
+        return ScoreDistribution(
+            count=self.count,
+            mean=self.mean,
+            m2=self.m2,
+            histogram=self.histogram,
+            bucket_width=self.bucket_width,
+        )
+
+    def apply_distribution(self, distribution: ScoreDistribution) -> None:
+        self.count = distribution.count
+        self.mean = distribution.mean
+        self.m2 = distribution.m2
+        self.bucket_width = distribution.bucket_width
+        self.histogram = distribution.to_dict()["histogram"]
+
+    @classmethod
+    def build_distribution(cls, game_model=None) -> ScoreDistribution:
+        """gamesテーブルからスコア分布を構築する（初期化・再同期用）"""
+        if game_model is None:
+            from .game import Game
+
+            game_model = Game
+
+        scores = (
+            game_model.objects.filter(score__gt=0)
+            .values_list("score", flat=True)
+            .iterator(chunk_size=ScoreStatisticsConstants.REBUILD_CHUNK_SIZE)
+        )
+        return ScoreDistribution.from_scores(scores)
+
+    @staticmethod
+    def shard_keys() -> list[str]:
+        """分散先のキー一覧（先頭は従来の集計レコード）"""
+        key = ScoreStatisticsConstants.GLOBAL_KEY
+        return [key] + [
+            f"{key}:{index}" for index in range(1, ScoreStatisticsConstants.SHARD_COUNT)
+        ]
+
+    @classmethod
+    def load_distribution(cls) -> ScoreDistribution:
+        """全シャードを結合したスコア分布を返す（ロックは取得しない）"""
+        distribution = ScoreDistribution()
+        for stats in cls.objects.filter(key__in=cls.shard_keys()):
+            distribution.merge(stats.to_distribution())
+        return distribution
+
+    @classmethod
+    def rebuild(cls) -> ScoreDistribution:
+        """gamesテーブルから統計を再構築して保存する
+
+        再構築結果は先頭のシャードに保存し、他のシャードは空にする。
+        呼び出し側のトランザクション内で使用すること。
+        """
+        distribution = cls.build_distribution()
+        empty = ScoreDistribution()
+        for index, key in enumerate(cls.shard_keys()):
+            stats = cls(key=key)
+            stats.apply_distribution(distribution if index == 0 else empty)
+            stats.save()
+        return distribution
+
+    @classmethod
+    def record_score(cls, score: int) -> None:
+        """完了したゲームのスコアを統計に反映する
+
+        ロックされていないシャードを1行選んで更新する（全シャードが使用中の場合のみ
+        待機する）。行ロックはトランザクション終了まで保持されるため、
+        ミューテーションの最後に呼び出すこと。シャードが存在しない場合は
+        記録せず、rebuild_score_statistics での再構築を待つ。
+        """
+        if score <= 0:
+            return
+        keys = cls.shard_keys()
+        stats = (
+            cls.objects.select_for_update(skip_locked=True)
+            .filter(key__in=keys)
+            .order_by("?")
+            .first()
+        )
+        if stats is None:
+            stats = (
+                cls.objects.select_for_update().filter(key=random.choice(keys)).first()
+            )
+        if stats is None:
+            logger.warning("スコア統計レコードが存在しないため記録をスキップします")
+            return
+
+        distribution = stats.to_distribution()
+        distribution.add(score)
+        stats.apply_distribution(distribution)
+        stats.save(update_fields=["count", "mean", "m2", "histogram", "updated_at"])
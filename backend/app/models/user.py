@@ -3,10 +3,16 @@ import uuid
 
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Rank
+from django.utils import timezone
+
+from app.utils import leaderboard_cache, principal_cache
+from app.utils.constants import RankingConstants
 
 from .managers import UserManager
 from .ranking import Ranking
+from .ranking_index import RankingIndexNode
 
 logger = logging.getLogger("app")
 
@@ -27,6 +33,11 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["gold"], name="idx_user_gold"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -39,40 +50,87 @@ class User(AbstractBaseUser, PermissionsMixin):
                 old_instance = User.objects.get(pk=self.pk)
                 self._old_gold = old_instance.gold
                 self._old_is_active = old_instance.is_active
+                self._old_leaderboard_fields = (
+                    old_instance.name,
+                    old_instance.icon,
+                    old_instance.gold,
+                    old_instance.is_active,
+                )
+                self._old_principal_fields = (
+                    old_instance.gold,
+                    old_instance.is_active,
+                    old_instance.is_staff,
+                )
             except User.DoesNotExist:
                 pass
 
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
-        if not is_new:
-            # ランキング処理
-            if (
-                hasattr(self, "_old_is_active")
-                and self._old_is_active != self.is_active
-                and self.is_active
-            ):
-                # is_activeがFalseからTrueに変更された場合
-                self._handle_activation()
-            elif (
-                hasattr(self, "_old_gold")
-                and self._old_gold != self.gold
-                and self.is_active
-            ):
-                # アクティブユーザーのゴールドが変更された場合
-                self._handle_gold_update()
+            # 順位インデックスへの反映（旧ゴールドを-1、新ゴールドを+1）
+            self._sync_ranking_index(
+                getattr(self, "_old_gold", None) if not is_new else None,
+                getattr(self, "_old_is_active", False) if not is_new else False,
+            )
+
+            if not is_new:
+                # ランキング処理
+                if (
+                    hasattr(self, "_old_is_active")
+                    and self._old_is_active != self.is_active
+                    and self.is_active
+                ):
+                    # is_activeがFalseからTrueに変更された場合
+                    self._handle_activation()
+                elif (
+                    hasattr(self, "_old_gold")
+                    and self._old_gold != self.gold
+                    and self.is_active
+                ):
+                    # アクティブユーザーのゴールドが変更された場合
+                    self._handle_gold_update()
+
+                # ランキング表示に関わる項目が変わった場合はキャッシュを無効化
+                if getattr(self, "_old_leaderboard_fields", None) != (
+                    self.name,
+                    self.icon,
+                    self.gold,
+                    self.is_active,
+                ):
+                    leaderboard_cache.invalidate_on_commit()
+
+                # 認証キャッシュのスナップショットに含まれる項目が変わった場合
+                if getattr(self, "_old_principal_fields", None) != (
+                    self.gold,
+                    self.is_active,
+                    self.is_staff,
+                ):
+                    principal_cache.invalidate_user_on_commit(self.pk)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            if self.is_active and self.gold is not None:
+                RankingIndexNode.apply_deltas({self.gold: -1})
+            leaderboard_cache.invalidate_on_commit()
+            principal_cache.invalidate_user_on_commit(self.pk)
+            return super().delete(*args, **kwargs)
+
+    def _sync_ranking_index(self, old_gold, old_is_active):
+        """順位インデックス（Fenwick木）の件数を変更前後の状態に合わせて更新"""
+        deltas = {}
+        if old_is_active and old_gold is not None:
+            deltas[old_gold] = deltas.get(old_gold, 0) - 1
+        if self.is_active and self.gold is not None:
+            deltas[self.gold] = deltas.get(self.gold, 0) + 1
+        RankingIndexNode.apply_deltas(deltas)
 
     @classmethod
     def insert_user_ranking(cls, user):
-        """新規ユーザーを適切なランキングに挿入"""
-        # 1回のクエリで適切なランキングを計算
-        new_ranking = cls.objects.filter(is_active=True, gold__gt=user.gold).count() + 1
-
-        # ランキングレコードを作成
-        ranking = Ranking.objects.create(user=user, ranking=new_ranking)
-
-        # 下位のユーザーのランキングを1つずつ下げる
-        cls._shift_rankings_down(new_ranking + 1)
-
+        """新規ユーザーのランキングレコードを作成（他ユーザーの順位は書き換えない）"""
+        new_ranking = RankingIndexNode.rank_of(user.gold or 0)
+        ranking, _ = Ranking.objects.update_or_create(
+            user=user, defaults={"ranking": new_ranking}
+        )
         return ranking
 
     def _handle_activation(self):
@@ -89,50 +147,63 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     @classmethod
     def update_user_ranking(cls, user):
-        """特定ユーザーのランキングを更新"""
-        try:
-            # 現在のランキングを取得
-            current_ranking = Ranking.objects.get(user=user)
-            old_ranking = current_ranking.ranking
-
-            # 新しいランキングを計算
-            new_ranking = (
-                cls.objects.filter(is_active=True, gold__gt=user.gold).count() + 1
-            )
-
-            # ランキングが変わった場合のみ更新
-            if old_ranking != new_ranking:
-                if new_ranking < old_ranking:
-                    # 上位に移動した場合、下位のユーザーのランキングを1つずつ下げる
-                    cls._shift_rankings_down(new_ranking + 1, old_ranking)
-                else:
-                    # 下位に移動した場合、上位のユーザーのランキングを1つずつ上げる
-                    cls._shift_rankings_up(old_ranking, new_ranking - 1)
-
-                # ユーザーのランキングを更新
-                current_ranking.ranking = new_ranking
-                current_ranking.save()
-        except Ranking.DoesNotExist:
+        """特定ユーザーのランキングを更新
+
+        順位はFenwick木から O(log G) で求め、本人のレコードのみ更新する。
+        他ユーザーの順位のずれは一括再計算で解消する。
+        """
+        new_ranking = RankingIndexNode.rank_of(user.gold or 0)
+        updated = Ranking.objects.filter(user=user).update(
+            ranking=new_ranking, updated_at=timezone.now()
+        )
+        if not updated:
             # ランキングレコードが存在しない場合は新規作成
             cls.insert_user_ranking(user)
 
     @classmethod
-    def _shift_rankings_down(cls, start_ranking, end_ranking=None):
-        """指定された範囲のランキングを1つずつ下げる"""
-        if end_ranking is None:
-            # end_rankingが指定されていない場合、start_ranking以降のすべてのランキングを下げる
-            Ranking.objects.filter(ranking__gte=start_ranking).update(
-                ranking=models.F("ranking") + 1
+    def update_rankings(cls, batch_size=RankingConstants.RECOMPUTE_BATCH_SIZE):
+        """全ユーザーのランキングを一括再計算する
+
+        RANK() OVER (ORDER BY gold DESC) を1回だけ評価し、
+        順位が変わったレコードのみを batch_size 件ずつ更新・コミットする。
+
+        Returns:
+            int: 更新したランキングレコード数
+        """
+        ranked = (
+            cls.objects.filter(is_active=True, gold__isnull=False)
+            .annotate(
+                new_ranking=models.Window(
+                    expression=Rank(), order_by=models.F("gold").desc()
+                )
             )
-        else:
-            # 指定された範囲のランキングを下げる
-            Ranking.objects.filter(
-                ranking__gte=start_ranking, ranking__lte=end_ranking
-            ).update(ranking=models.F("ranking") + 1)
-
-    @classmethod
-    def _shift_rankings_up(cls, start_ranking, end_ranking):
-        """指定された範囲のランキングを1つずつ上げる"""
-        Ranking.objects.filter(
-            ranking__gte=start_ranking, ranking__lte=end_ranking
-        ).update(ranking=models.F("ranking") - 1)
+            .values_list("ranking__id", "ranking__ranking", "new_ranking")
+        )
+
+        updated_count = 0
+        pending = []
+        now = timezone.now()
+        for ranking_id, current_ranking, new_ranking in ranked.iterator(
+            chunk_size=batch_size
+        ):
+            # ランキングレコード未作成のユーザーも順位の母数には含める
+            if ranking_id is None or current_ranking == new_ranking:
+                continue
+            pending.append(Ranking(id=ranking_id, ranking=new_ranking, updated_at=now))
+            if len(pending) >= batch_size:
+                updated_count += cls._write_ranking_batch(pending)
+                pending = []
+        if pending:
+            updated_count += cls._write_ranking_batch(pending)
+
+        if updated_count:
+            leaderboard_cache.invalidate_on_commit()
+        logger.info(f"ランキング一括再計算完了: updated={updated_count}")
+        return updated_count
+
+    @staticmethod
+    def _write_ranking_batch(rankings):
+        """ランキングの変更分を1バッチとして更新（バッチごとにコミット）"""
+        with transaction.atomic():
+            Ranking.objects.bulk_update(rankings, ["ranking", "updated_at"])
+        return len(rankings)
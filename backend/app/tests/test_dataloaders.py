@@ -0,0 +1,43 @@
+import graphene
+from django.test import RequestFactory, TestCase
+
+from app.models import Game, User
+from app.schema.queries import UserType
+from app.utils.dataloaders import load_related_many
+from app.views.game.typeandbet import GameType
+
+
+class Query(graphene.ObjectType):
+    games = graphene.List(GameType)
+
+    def resolve_games(self, info):
+        games = list(Game.objects.order_by("created_at"))
+        load_related_many(games, "user", info)
+        return games
+
+
+schema = graphene.Schema(query=Query, types=[UserType])
+
+
+class LoadRelatedManyTests(TestCase):
+    """一覧の外部キー参照が件数に依存しないクエリ数で解決されることを確認する"""
+
+    def setUp(self):
+        for i in range(5):
+            user = User.objects.create_user(
+                email=f"player{i}@example.com", password="password", name=f"p{i}"
+            )
+            Game.objects.create(user=user, bet_gold=100, score=0)
+
+    def execute(self):
+        request = RequestFactory().post("/graphql/")
+        return schema.execute("{ games { id user { name } } }", context_value=request)
+
+    def test_game_users_are_loaded_in_one_query(self):
+        # ゲーム一覧の取得と、ユーザーの一括取得の2回のみ
+        with self.assertNumQueries(2):
+            result = self.execute()
+
+        self.assertIsNone(result.errors)
+        names = [game["user"]["name"] for game in result.data["games"]]
+        self.assertEqual(names, [f"p{i}" for i in range(5)])
@@ -0,0 +1,99 @@
+import graphene
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+
+from app.utils.graphql_throttling import RateLimitMiddleware, graphql_throttle
+from app.utils.throttling import ThrottlingManager, cache
+
+# ミューテーション本体の実行回数（フィールド名 → 回数）
+calls = {}
+
+
+def _count(name: str) -> None:
+    calls[name] = calls.get(name, 0) + 1
+
+
+class ThrottledMutation(graphene.Mutation):
+    ok = graphene.Boolean()
+
+    @classmethod
+    @graphql_throttle("2/m")
+    def mutate(cls, root, info):
+        _count("throttled")
+        return ThrottledMutation(ok=True)
+
+
+class FailingThrottledMutation(graphene.Mutation):
+    ok = graphene.Boolean()
+
+    @classmethod
+    @graphql_throttle("2/m")
+    def mutate(cls, root, info):
+        _count("failing")
+        raise Exception("認証に失敗しました")
+
+
+class PlainMutation(graphene.Mutation):
+    ok = graphene.Boolean()
+
+    @classmethod
+    def mutate(cls, root, info):
+        _count("plain")
+        return PlainMutation(ok=True)
+
+
+class Mutation(graphene.ObjectType):
+    throttled = ThrottledMutation.Field()
+    failing = FailingThrottledMutation.Field()
+    plain = PlainMutation.Field()
+
+
+class Query(graphene.ObjectType):
+    ping = graphene.Boolean()
+
+
+schema = graphene.Schema(query=Query, mutation=Mutation)
+
+
+class RateLimitMiddlewareTests(TestCase):
+    """RateLimitMiddleware でミューテーション本体が1回だけ実行されることを確認する"""
+
+    def setUp(self):
+        cache.clear()
+        calls.clear()
+        ThrottlingManager._previous_counts.clear()
+        ThrottlingManager._local_tier = None
+        ThrottlingManager._local_tier_initialized = False
+
+    def execute(self, field: str):
+        request = RequestFactory().post("/graphql/")
+        request.user = AnonymousUser()
+        return schema.execute(
+            f"mutation {{ {field} {{ ok }} }}",
+            context_value=request,
+            middleware=[RateLimitMiddleware()],
+        )
+
+    def test_throttled_mutation_runs_once_per_allowed_request(self):
+        results = [self.execute("throttled") for _ in range(4)]
+
+        self.assertEqual(calls.get("throttled"), 2)
+        self.assertEqual(
+            [result.errors is None for result in results], [True, True, False, False]
+        )
+        self.assertIn("レート制限に達しました", results[2].errors[0].message)
+
+    def test_failing_mutation_is_not_retried(self):
+        results = [self.execute("failing") for _ in range(3)]
+
+        # 本体の例外で再実行されず、拒否されたリクエストでは実行されない
+        self.assertEqual(calls.get("failing"), 2)
+        self.assertEqual(results[0].errors[0].message, "認証に失敗しました")
+        self.assertIn("レート制限に達しました", results[2].errors[0].message)
+
+    def test_plain_mutation_runs_once_per_request(self):
+        for _ in range(5):
+            result = self.execute("plain")
+            self.assertIsNone(result.errors)
+
+        self.assertEqual(calls.get("plain"), 5)
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import jwt
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from app.models import User
+from app.utils.jwt_middleware import authenticate_token
+from app.utils.principal_cache import cache
+
+
+class PrincipalCacheTests(TestCase):
+    """認証済みユーザーのスナップショットのキャッシュと無効化を確認する"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="player@example.com", password="password", name="player"
+        )
+        self.token = jwt.encode(
+            {
+                "user_id": str(self.user.id),
+                "exp": (datetime.now() + timedelta(days=1)).timestamp(),
+                "type": "access",
+            },
+            settings.JWT_SECRET,
+            algorithm="HS256",
+        )
+
+    def test_cached_principal_skips_user_lookup(self):
+        authenticate_token(self.token)
+
+        with CaptureQueriesContext(connection) as queries:
+            user = authenticate_token(self.token)
+        # 共有キャッシュ（DBキャッシュ）の参照のみで、ユーザーの取得は行わない
+        table = User._meta.db_table
+        self.assertFalse([q for q in queries.captured_queries if table in q["sql"]])
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.gold, self.user.gold)
+
+    def test_save_invalidates_snapshot(self):
+        authenticate_token(self.token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.gold = 1234
+            self.user.save()
+
+        self.assertEqual(authenticate_token(self.token).gold, 1234)
+
+    def test_deactivated_user_is_anonymous(self):
+        authenticate_token(self.token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertFalse(authenticate_token(self.token).is_authenticated)
+
+    def test_tampered_signature_is_rejected(self):
+        authenticate_token(self.token)
+
+        self.assertFalse(authenticate_token(self.token[:-2] + "xx").is_authenticated)
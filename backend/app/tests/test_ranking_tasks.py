@@ -0,0 +1,44 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from app.models import User
+from app.utils import ranking_tasks
+from app.utils.ranking_tasks import RECOMPUTE_LOCK_KEY, cache
+
+
+class RecomputeLockTests(TestCase):
+    """ランキング一括再計算のロックの取得・解放と再予約を確認する"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_release_deletes_only_own_lock(self):
+        cache.add(RECOMPUTE_LOCK_KEY, "other", 60)
+        self.assertFalse(ranking_tasks._release_lock("mine"))
+        self.assertEqual(cache.get(RECOMPUTE_LOCK_KEY), "other")
+
+        self.assertTrue(ranking_tasks._release_lock("other"))
+        self.assertIsNone(cache.get(RECOMPUTE_LOCK_KEY))
+
+    def test_lock_reacquired_during_run_is_kept(self):
+        def reacquire():
+            # 再計算中にロックが期限切れになり、他ワーカーが取得し直した状況
+            cache.set(RECOMPUTE_LOCK_KEY, "other", 60)
+
+        with mock.patch.object(User, "update_rankings", side_effect=reacquire):
+            ranking_tasks._recompute_with_lock()
+
+        self.assertEqual(cache.get(RECOMPUTE_LOCK_KEY), "other")
+
+    def test_skipped_run_is_rescheduled(self):
+        cache.add(RECOMPUTE_LOCK_KEY, "other", 60)
+
+        with (
+            mock.patch.object(User, "update_rankings") as update_rankings,
+            mock.patch.object(ranking_tasks, "schedule_rankings_recompute") as schedule,
+        ):
+            ranking_tasks._recompute_with_lock()
+
+        update_rankings.assert_not_called()
+        schedule.assert_called_once_with()
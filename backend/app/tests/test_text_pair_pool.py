@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from app.models.game import TextPair
+from app.utils.text_pair_pool import TextPairPool
+
+
+class TextPairPoolTests(TestCase):
+    """裏の補充が間に合わなくても、毎回 count 件を返すことを確認する"""
+
+    def create_pairs(self, count: int) -> None:
+        TextPair.objects.bulk_create(
+            TextPair(kanji=f"文章{i}", hiragana=f"ぶんしょう{i}", is_converted=True)
+            for i in range(count)
+        )
+        TextPair.objects.create(kanji="未変換", is_converted=False)
+
+    def make_pool(self, max_size: int) -> TextPairPool:
+        pool = TextPairPool(
+            max_size=max_size,
+            max_bytes=8 * 1024 * 1024,
+            refill_threshold=10,
+            max_age=600,
+        )
+        # 裏の補充が終わらない状況を再現する
+        pool._refill_in_background = mock.Mock()
+        return pool
+
+    def assert_full_draw(self, drawn, count: int) -> None:
+        self.assertEqual(len(drawn), count)
+        self.assertEqual(len({text_pair_id for text_pair_id, _, _ in drawn}), count)
+        self.assertTrue(all(hiragana for _, _, hiragana in drawn))
+
+    def test_draw_tops_up_drained_buffer(self):
+        self.create_pairs(100)
+        pool = self.make_pool(max_size=40)
+
+        for _ in range(10):
+            self.assert_full_draw(pool.draw(30), 30)
+
+    def test_small_table_is_reshuffled_without_reload(self):
+        self.create_pairs(35)
+        pool = self.make_pool(max_size=3000)
+        self.assert_full_draw(pool.draw(30), 30)
+
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                self.assert_full_draw(pool.draw(30), 30)
+
+    def test_returns_all_pairs_when_table_is_smaller_than_count(self):
+        self.create_pairs(5)
+        pool = self.make_pool(max_size=3000)
+
+        self.assert_full_draw(pool.draw(30), 5)
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from django.test import TestCase, override_settings
+
+from app.models.game import TextPair
+from app.utils.stub_text_model import StubGenerativeModel
+from app.views.game.textgenerator import TextGenerator, TextGeneratorError
+
+
+class FlakyModel(StubGenerativeModel):
+    """最初の failures 回だけ失敗（または応答を遅延）するスタブモデル"""
+
+    def __init__(self, failures: int, slow: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.slow = slow
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+            failing = self.calls <= self.failures
+        if failing:
+            if self.slow:
+                time.sleep(1.0)
+            else:
+                raise RuntimeError("一時的なエラー")
+        return super().generate_content(prompt)
+
+
+@override_settings(
+    TEXT_GENERATION_TIMEOUT_SECONDS=0.2,
+    TEXT_GENERATION_MAX_RETRIES=2,
+    TEXT_GENERATION_RETRY_BACKOFF_SECONDS=0.01,
+)
+class GenerateTextConcurrentlyTests(TestCase):
+    """スタブモデルを使い、外部APIなしで並列生成を確認する"""
+
+    def test_saves_sentences_from_all_prompts(self):
+        model = StubGenerativeModel(sentences_per_call=5, seed=1)
+        result = TextGenerator(model=model).generate_text_concurrently(
+            prompt_count=3, concurrency=2
+        )
+
+        self.assertEqual(result["failed_prompts"], 0)
+        self.assertGreater(len(result["sentences"]), 0)
+        self.assertEqual(TextPair.objects.count(), len(result["sentences"]))
+
+    def test_retries_transient_errors(self):
+        model = FlakyModel(failures=2, sentences_per_call=5, seed=1)
+        result = TextGenerator(model=model).generate_text_concurrently(
+            prompt_count=1, concurrency=1
+        )
+
+        self.assertEqual(model.calls, 3)
+        self.assertEqual(result["failed_prompts"], 0)
+        self.assertGreater(len(result["sentences"]), 0)
+
+    def test_retries_after_timeout(self):
+        model = FlakyModel(failures=1, slow=True, sentences_per_call=5, seed=1)
+        started = time.monotonic()
+        result = TextGenerator(model=model).generate_text_concurrently(
+            prompt_count=1, concurrency=1
+        )
+
+        # 遅延した呼び出しの完了を待たずに再試行している
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(model.calls, 2)
+        self.assertEqual(result["failed_prompts"], 0)
+
+    def test_partial_failure_keeps_successful_prompts(self):
+        model = FlakyModel(failures=3, sentences_per_call=5, seed=1)
+        with override_settings(TEXT_GENERATION_MAX_RETRIES=0):
+            result = TextGenerator(model=model).generate_text_concurrently(
+                prompt_count=4, concurrency=1
+            )
+
+        self.assertEqual(result["failed_prompts"], 3)
+        self.assertGreater(len(result["sentences"]), 0)
+
+    def test_raises_when_every_prompt_times_out(self):
+        model = StubGenerativeModel(latency=1.0)
+        started = time.monotonic()
+        with self.assertRaises(TextGeneratorError):
+            TextGenerator(model=model).generate_text_concurrently(
+                prompt_count=2, concurrency=2
+            )
+
+        # タイムアウト（0.2秒 x 3回）とバックオフで打ち切られる
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertEqual(TextPair.objects.count(), 0)
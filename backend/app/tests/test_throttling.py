@@ -0,0 +1,62 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from app.utils.throttling import RateLimit, ThrottlingManager, cache
+
+
+class ThrottlingManagerTests(TestCase):
+    """レート制限のカウンターの保存先と、取り消し失敗時の動作を確認する"""
+
+    def setUp(self):
+        caches["default"].clear()
+        cache.clear()
+        ThrottlingManager._previous_counts.clear()
+        ThrottlingManager._local_tier = None
+        ThrottlingManager._local_tier_initialized = False
+
+    def hit_with_expired_counter(self) -> list[bool]:
+        rate = RateLimit.parse("2/m")
+        # 取り消し時点で共有カウンターが期限切れになっている状況を再現する
+        with mock.patch.object(cache, "decr", side_effect=ValueError("expired")):
+            return [ThrottlingManager.hit("user", "action", rate) for _ in range(3)]
+
+    @override_settings(THROTTLE_LOCAL_TIER_ENABLED=False)
+    def test_counter_lives_in_shared_cache(self):
+        rate = RateLimit.parse("2/m")
+        window_index = int(time.time() // rate.window)
+        now = window_index * rate.window + 1.0
+        with mock.patch("app.utils.throttling.time.time", return_value=now):
+            ThrottlingManager.hit("user", "action", rate)
+
+        key = f"{ThrottlingManager.get_cache_key('user', 'action')}:{window_index}"
+        self.assertEqual(caches[settings.SHARED_CACHE_ALIAS].get(key), 1)
+        self.assertIsNone(caches["default"].get(key))
+
+    @override_settings(THROTTLE_LOCAL_TIER_ENABLED=True, THROTTLE_LOCAL_SYNC_BATCH=4)
+    def test_local_tier_flushes_to_shared_cache(self):
+        rate = RateLimit.parse("100/m")
+        window_index = int(time.time() // rate.window)
+        now = window_index * rate.window + 1.0
+        with mock.patch("app.utils.throttling.time.time", return_value=now):
+            for _ in range(3):
+                ThrottlingManager.hit("user", "action", rate)
+
+        key = f"{ThrottlingManager.get_cache_key('user', 'action')}:{window_index}"
+        # 初回のみ同期し、残りはワーカー内に溜めてからまとめて反映する
+        shared = caches[settings.SHARED_CACHE_ALIAS]
+        self.assertEqual(shared.get(key), 1)
+        ThrottlingManager.get_local_tier().flush(key)
+        self.assertEqual(shared.get(key), 3)
+        self.assertIsNone(caches["default"].get(key))
+
+    @override_settings(THROTTLE_LOCAL_TIER_ENABLED=False)
+    def test_rejects_when_decr_fails(self):
+        self.assertEqual(self.hit_with_expired_counter(), [True, True, False])
+
+    @override_settings(THROTTLE_LOCAL_TIER_ENABLED=True)
+    def test_local_tier_rejects_when_decr_fails(self):
+        self.assertEqual(self.hit_with_expired_counter(), [True, True, False])
@@ -37,7 +37,6 @@ class ResultErrorMessages:
     GAME_NOT_FOUND = "ゲームが見つかりません"
     RANKING_CALCULATION_ERROR = "ランキングの計算中にエラーが発生しました"
     GOLD_CALCULATION_ERROR = "ゴールドの計算中にエラーが発生しました"
-    RANK_CHANGE_CALCULATION_ERROR = "ランク変動の計算中にエラーが発生しました"
     NEXT_RANK_CALCULATION_ERROR = "次のランク必要金額の計算中にエラーが発生しました"
 
 
@@ -109,6 +108,15 @@ class RankingConstants:
     RANKING_INCREMENT = 1
     RANKING_DECREMENT = 1
 
+    # 順位計算用Fenwick木のサイズ（ノード番号 = INDEX_TREE_SIZE - gold）
+    # 2の累乗にしないことで全件を持つ根ノード（全更新が集中する行）をなくす。
+    # IntegerFieldのgold上限 2^31-1 を包含する
+    INDEX_TREE_SIZE = (1 << 32) - 1
+    # Fenwick木ノードを一括更新する際の1文あたりの行数
+    INDEX_WRITE_CHUNK_SIZE = 500
+    # ランキング一括再計算で1トランザクションあたりに更新する件数
+    RECOMPUTE_BATCH_SIZE = 1000
+
 
 class EmailConstants:
     """メール関連の定数を定義するクラス"""
@@ -120,3 +128,62 @@ class EmailConstants:
 
     # フロントエンドURL
     DEFAULT_FRONTEND_URL = "http://localhost:3000"
+
+
+class ScoreStatisticsConstants:
+    """スコア統計関連の定数を定義するクラス"""
+
+    # 統計レコードのキー（シャードは "global:1" 〜 "global:<SHARD_COUNT - 1>"）
+    GLOBAL_KEY = "global"
+
+    # スコア登録時の行ロック競合を避けるための分散行数
+    SHARD_COUNT = 16
+
+    # 中央値推定用ヒストグラムのバケット幅（スコア単位）
+    # 小さくするほど中央値の誤差は減るが、ヒストグラムの行サイズが増える
+    HISTOGRAM_BUCKET_WIDTH = 10
+
+    # 再構築時に1度に読み込む件数
+    REBUILD_CHUNK_SIZE = 5000
+
+
+class TextConversionConstants:
+    """ひらがな変換関連の定数を定義するクラス"""
+
+    # 1回の読み込み・書き込み（コミット）で扱う件数
+    CHUNK_SIZE = 500
+
+    # 変換に失敗した文章を再試行するまでの待ち時間（秒）
+    FAILURE_BACKOFF_SECONDS = 24 * 60 * 60
+
+
+class TextIngestionConstants:
+    """生成文章の取り込み関連の定数を定義するクラス"""
+
+    # 重複判定の対象とする既存文章の期間（パーティションの保持期間と同じ）
+    DEDUP_LOOKBACK_DAYS = 3
+
+    # content_hash の長さ（SHA-256 の16進表記）
+    CONTENT_HASH_LENGTH = 64
+
+
+class JobRunConstants:
+    """ジョブ実行履歴関連の定数を定義するクラス"""
+
+    # 実行ステータス
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_TIMEOUT = "timeout"
+    STATUS_SKIPPED = "skipped"
+
+    # 実行元
+    SOURCE_SCHEDULER = "scheduler"
+    SOURCE_COMMAND = "command"
+
+    MAX_JOB_NAME_LENGTH = 64
+    MAX_STATUS_LENGTH = 16
+    MAX_ERROR_MESSAGE_LENGTH = 2000
+
+    # レポートのデフォルト集計期間（時間）
+    REPORT_WINDOW_HOURS = 24
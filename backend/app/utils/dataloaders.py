@@ -0,0 +1,89 @@
+import logging
+
+logger = logging.getLogger("app")
+
+
+class ModelLoader:
+    """リクエスト単位で外部キー参照をまとめて解決するローダー
+
+    一覧系リゾルバーで load_many() を呼ぶと、未取得のキーを1回の IN クエリで
+    まとめて取得する。取得済みのキーはリクエスト内で再問い合わせしない。
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._cache = {}
+        self._pending = set()
+
+    def expect(self, keys) -> None:
+        """後続の load() で参照予定のキーを登録する"""
+        self._pending.update(
+            key for key in keys if key is not None and key not in self._cache
+        )
+
+    def load(self, key):
+        if key is None:
+            return None
+        if key not in self._cache:
+            self._pending.add(key)
+            self._dispatch()
+        return self._cache.get(key)
+
+    def load_many(self, keys) -> list:
+        self.expect(keys)
+        return [self.load(key) for key in keys]
+
+    def _dispatch(self) -> None:
+        keys = list(self._pending)
+        self._pending.clear()
+        if not keys:
+            return
+        found = {obj.pk: obj for obj in self.model.objects.filter(pk__in=keys)}
+        for key in keys:
+            # 存在しないキーも None として記録し、再問い合わせを防ぐ
+            self._cache[key] = found.get(key)
+        logger.debug(f"ローダー一括取得: model={self.model.__name__}, keys={len(keys)}")
+
+
+def get_loader(info, model) -> ModelLoader:
+    """GraphQLリクエスト（info.context）単位でローダーを取得する"""
+    request = info.context
+    loaders = getattr(request, "_dataloaders", None)
+    if loaders is None:
+        loaders = {}
+        request._dataloaders = loaders
+    loader = loaders.get(model)
+    if loader is None:
+        loader = ModelLoader(model)
+        loaders[model] = loader
+    return loader
+
+
+def load_related(instance, field_name: str, info):
+    """外部キーをローダー経由で解決する（取得済みの場合はそれを返す）
+
+    一覧の各要素から呼ぶ場合は、先に一覧のリゾルバーで load_related_many() を
+    呼んでおくと、要素ごとの問い合わせが発生しない。
+    """
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        return getattr(instance, field_name)
+    loader = get_loader(info, field.related_model)
+    return loader.load(getattr(instance, field.attname))
+
+
+def load_related_many(instances, field_name: str, info) -> None:
+    """一覧の外部キーを load_many() で1回の IN クエリにまとめて解決し、
+    各インスタンスに取得結果を設定する（取得済みの要素はそのまま）
+    """
+    instances = list(instances)
+    if not instances:
+        return
+    field = instances[0]._meta.get_field(field_name)
+    pending = [instance for instance in instances if not field.is_cached(instance)]
+    if not pending:
+        return
+    loader = get_loader(info, field.related_model)
+    related = loader.load_many([getattr(obj, field.attname) for obj in pending])
+    for instance, value in zip(pending, related):
+        field.set_cached_value(instance, value)
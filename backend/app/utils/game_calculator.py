@@ -30,6 +30,21 @@ class GameCalculator:
         std_dev = statistics.stdev(past_scores) if len(past_scores) > 1 else 1
         return (score - median) / std_dev if std_dev != 0 else 0
 
+    @staticmethod
+    def calculate_z_score_from_distribution(score: int, distribution) -> float:
+        """
+        集計済みのスコア分布からZスコアを計算する
+
+        中央値はヒストグラムからの推定値のため、calculate_z_score とは
+        バケット幅の範囲で結果が異なる（ScoreDistribution.median を参照）。
+        """
+        if distribution.count == 0:
+            return 0
+
+        median = distribution.median()
+        std_dev = distribution.std_dev()
+        return (score - median) / std_dev if std_dev != 0 else 0
+
     @staticmethod
     def calculate_multiplier(z_score: float) -> float:
         """
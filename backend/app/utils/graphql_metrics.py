@@ -0,0 +1,207 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+# 集計対象の区分
+OPERATION = "operation"
+RESOLVER = "resolver"
+
+# 集計キーの上限を超えた操作名をまとめるキー
+OVERFLOW_KEY = "(other)"
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "GRAPHQL_METRICS_ENABLED", False)
+
+
+class RequestStats:
+    """1リクエスト分のSQL実行状況（connection.execute_wrapper として使用）"""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.operation_key = None
+        self.failed = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_seconds += time.perf_counter() - started
+
+
+class GraphQLMetricsRegistry:
+    """操作・リゾルバー単位の処理時間とSQL実行状況をプロセス内で集計する
+
+    - キーは操作が "<query|mutation> <操作名>"、リゾルバーが "<親の型>.<フィールド>"
+    - 操作名はクライアントが自由に指定できるため、max_keys を超えた分は
+      OVERFLOW_KEY にまとめてメモリ使用量を制限する
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._stats: dict[str, dict[str, dict]] = {OPERATION: {}, RESOLVER: {}}
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+
+    def record(
+        self,
+        kind: str,
+        key: str,
+        seconds: float,
+        sql_count: int,
+        sql_seconds: float,
+        failed: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._stats[kind]
+            entry = stats.get(key)
+            if entry is None:
+                if len(stats) >= self.max_keys:
+                    key = OVERFLOW_KEY
+                entry = stats.setdefault(
+                    key,
+                    {
+                        "count": 0,
+                        "errors": 0,
+                        "seconds": 0.0,
+                        "max_seconds": 0.0,
+                        "sql_count": 0,
+                        "sql_seconds": 0.0,
+                    },
+                )
+            entry["count"] += 1
+            entry["errors"] += int(failed)
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["sql_count"] += sql_count
+            entry["sql_seconds"] += sql_seconds
+
+    def snapshot(self) -> dict:
+        """集計結果を合計処理時間の降順で返す"""
+        with self._lock:
+            stats = {
+                kind: {key: dict(entry) for key, entry in entries.items()}
+                for kind, entries in self._stats.items()
+            }
+        return {
+            "pid": os.getpid(),
+            "since": self._started_at,
+            "operations": self._format(stats[OPERATION]),
+            "resolvers": self._format(stats[RESOLVER]),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {OPERATION: {}, RESOLVER: {}}
+            self._started_at = time.time()
+
+    @staticmethod
+    def _format(entries: dict[str, dict]) -> list[dict]:
+        rows = []
+        for key, entry in entries.items():
+            count = entry["count"]
+            rows.append(
+                {
+                    "name": key,
+                    "count": count,
+                    "errors": entry["errors"],
+                    "total_ms": round(entry["seconds"] * 1000, 3),
+                    "avg_ms": round(entry["seconds"] / count * 1000, 3),
+                    "max_ms": round(entry["max_seconds"] * 1000, 3),
+                    "sql_queries": entry["sql_count"],
+                    "avg_sql_queries": round(entry["sql_count"] / count, 2),
+                    "sql_ms": round(entry["sql_seconds"] * 1000, 3),
+                }
+            )
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+
+@contextmanager
+def track_operation(request):
+    """GraphQLリクエスト全体の処理時間とSQL実行状況を計測する
+
+    操作の種類と名前は InstrumentationMiddleware がルートのリゾルバーで設定する
+    （構文エラーなどでリゾルバーまで到達しない場合は "unknown" として記録）。
+    """
+    stats = RequestStats()
+    request._graphql_metrics = stats
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(stats):
+            yield stats
+    finally:
+        graphql_metrics.record(
+            OPERATION,
+            stats.operation_key or "unknown",
+            time.perf_counter() - started,
+            stats.sql_count,
+            stats.sql_seconds,
+            stats.failed,
+        )
+
+
+def _path_depth(path) -> int:
+    """リストの添字を除いたフィールドの階層（ルートのフィールドが1）"""
+    depth = 0
+    while path is not None:
+        if isinstance(path.key, str):
+            depth += 1
+        path = path.prev
+    return depth
+
+
+class InstrumentationMiddleware:
+    """リゾルバー単位の処理時間とSQL実行状況を記録するGraphQLミドルウェア
+
+    - track_operation の計測中のリクエストのみを対象とする
+    - 全フィールドを計測すると負荷が大きいため、GRAPHQL_METRICS_RESOLVER_DEPTH
+      までの階層のフィールドのみを記録する
+    - リゾルバーが返したQuerySetを後続の処理で評価した場合、そのSQLは
+      リゾルバーではなく操作全体に計上される
+    """
+
+    def __init__(self):
+        self.max_depth = getattr(settings, "GRAPHQL_METRICS_RESOLVER_DEPTH", 2)
+
+    def resolve(self, next, root, info, **args):
+        stats = getattr(info.context, "_graphql_metrics", None)
+        if stats is None or _path_depth(info.path) > self.max_depth:
+            return next(root, info, **args)
+
+        if info.path.prev is None and stats.operation_key is None:
+            operation = info.operation
+            name = operation.name.value if operation.name else "anonymous"
+            stats.operation_key = f"{operation.operation.value} {name}"
+
+        sql_count = stats.sql_count
+        sql_seconds = stats.sql_seconds
+        started = time.perf_counter()
+        failed = False
+        try:
+            return next(root, info, **args)
+        except Exception:
+            failed = True
+            stats.failed = True
+            raise
+        finally:
+            graphql_metrics.record(
+                RESOLVER,
+                f"{info.parent_type.name}.{info.field_name}",
+                time.perf_counter() - started,
+                stats.sql_count - sql_count,
+                stats.sql_seconds - sql_seconds,
+                failed,
+            )
+
+
+graphql_metrics = GraphQLMetricsRegistry(
+    max_keys=getattr(settings, "GRAPHQL_METRICS_MAX_KEYS", 200)
+)
@@ -1,10 +1,9 @@
 import logging
-from functools import wraps
 from typing import Callable
 
 from graphql import GraphQLError
 
-from .throttling import ThrottlingManager
+from .throttling import RateLimit, ThrottlingManager
 
 logger = logging.getLogger("app")
 
@@ -15,10 +14,34 @@ class GraphQLThrottlingError(GraphQLError):
     pass
 
 
+class GraphQLRateLimitRule:
+    """ミューテーションに設定されたレート制限"""
+
+    def __init__(self, rate: RateLimit, key_func: Callable | None):
+        self.rate = rate
+        self.key_func = key_func
+
+    def get_identifier(self, info) -> str:
+        if self.key_func:
+            return self.key_func(info)
+        # デフォルトはユーザーIDまたはIPアドレス
+        return get_user_identifier(info)
+
+    def allow(self, info, action: str) -> bool:
+        identifier = self.get_identifier(info)
+        allowed = ThrottlingManager.hit(identifier, action, self.rate)
+        if not allowed:
+            logger.warning(f"GraphQLレート制限に達しました: {identifier}:{action}")
+        return allowed
+
+
 def graphql_throttle(limit: str, key_func: Callable = None):
     """
     GraphQLミューテーション用のレート制限デコレータ
 
+    mutate にレート制限を設定するだけで関数自体は包まない。
+    制限のチェックは RateLimitMiddleware がリゾルバーの実行前に行う。
+
     Args:
         limit: 制限（例: '10/m', '100/h'）
         key_func: 識別子を生成する関数
@@ -28,51 +51,47 @@ def graphql_throttle(limit: str, key_func: Callable = None):
         def mutate(cls, root, info, **kwargs):
             pass
     """
+    # 制限はデコレート時に1度だけ解析する
+    rule = GraphQLRateLimitRule(RateLimit.parse(limit), key_func)
 
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(cls, root, info, **kwargs):
-            try:
-                # ユーザー識別子を生成
-                if key_func:
-                    identifier = key_func(info)
-                else:
-                    # デフォルトはユーザーIDまたはIPアドレス
-                    if info.context.user.is_authenticated:
-                        identifier = f"user_{info.context.user.id}"
-                    else:
-                        # IPアドレスを取得（GraphQLコンテキストから）
-                        ip = getattr(info.context, "META", {}).get(
-                            "REMOTE_ADDR", "unknown"
-                        )
-                        identifier = f"ip_{ip}"
-
-                # レート制限チェック
-                if ThrottlingManager.is_rate_limited(identifier, func.__name__, limit):
-                    logger.warning(
-                        f"GraphQLレート制限に達しました: {identifier}:{func.__name__}"
-                    )
-                    raise GraphQLThrottlingError(f"レート制限に達しました: {limit}")
-
-                # カウンターをインクリメント
-                ThrottlingManager.increment_counter(identifier, func.__name__, limit)
-
-                # 元の関数を実行
-                return func(cls, root, info, **kwargs)
-
-            except GraphQLThrottlingError:
-                # レート制限エラーを再送出
-                raise
-            except Exception as e:
-                # その他のエラーは元の関数で処理
-                logger.error(f"GraphQL throttling エラー: {e}")
-                return func(cls, root, info, **kwargs)
-
-        return wrapper
+        func.rate_limit = rule
+        return func
 
     return decorator
 
 
+class RateLimitMiddleware:
+    """ミューテーションのレート制限を行うGraphQLミドルウェア
+
+    - ルートのミューテーションフィールドのみを対象とし、graphql_throttle で
+      設定された制限を確認する
+    - 制限の確認（識別子の生成・キャッシュ）で発生したエラーは記録して通過させ、
+      リゾルバーの実行とは分離する（リゾルバーの例外はそのまま呼び出し元へ返り、
+      リゾルバーが再実行されることはない）
+    - アクション名にはフィールド名を使用し、ミューテーションごとに別のカウンターとする
+    """
+
+    def resolve(self, next, root, info, **args):
+        if info.parent_type is info.schema.mutation_type:
+            rule = self._get_rule(info)
+            if rule is not None:
+                try:
+                    allowed = rule.allow(info, info.field_name)
+                except Exception as e:
+                    logger.error(f"GraphQL throttling エラー: {e}")
+                    allowed = True
+                if not allowed:
+                    raise GraphQLThrottlingError(f"レート制限に達しました: {rule.rate}")
+
+        return next(root, info, **args)
+
+    @staticmethod
+    def _get_rule(info) -> GraphQLRateLimitRule | None:
+        mutation = getattr(info.return_type, "graphene_type", None)
+        return getattr(getattr(mutation, "mutate", None), "rate_limit", None)
+
+
 def get_user_identifier(info) -> str:
     """GraphQLコンテキストからユーザー識別子を取得する"""
     if info.context.user.is_authenticated:
@@ -83,8 +102,9 @@ def get_user_identifier(info) -> str:
         return f"ip_{ip}"
 
 
-def get_game_action_identifier(info, action: str) -> str:
-    """ゲームアクション用の識別子を取得する"""
+def get_game_action_identifier(info, action: str | None = None) -> str:
+    """ゲームアクション用の識別子を取得する（未指定時はフィールド名をアクションとする）"""
+    action = action or info.field_name
     if info.context.user.is_authenticated:
         return f"game_{action}_{info.context.user.id}"
     else:
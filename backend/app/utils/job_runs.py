@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.utils import timezone
+
+from app.utils.constants import JobRunConstants
+
+logger = logging.getLogger("app")
+
+# 実行中のジョブの記録（スケジューラー経由の場合はコマンド側と共有する）
+_local = threading.local()
+
+
+class JobRunRecorder:
+    """1回のジョブ実行を job_runs テーブルへ記録する
+
+    記録の失敗でジョブ本体を止めないよう、DBエラーは警告ログのみとする。
+    """
+
+    def __init__(self, job_name: str, source: str = JobRunConstants.SOURCE_COMMAND):
+        self.job_name = job_name
+        self.source = source
+        self.rows_processed = 0
+        self.error_message = ""
+        self.failed = False
+        self.timed_out = False
+        self._run_id = None
+        self._started = None
+
+    def start(self) -> None:
+        from app.models import JobRun
+
+        self._started = time.perf_counter()
+        try:
+            run = JobRun.objects.create(job_name=self.job_name, source=self.source)
+            self._run_id = run.id
+        except Exception as e:
+            logger.warning(f"ジョブ実行履歴の作成エラー ({self.job_name}): {str(e)}")
+
+    def add_rows(self, count: int) -> None:
+        self.rows_processed += count
+
+    def fail(self, message: str) -> None:
+        self.failed = True
+        self.error_message = message
+
+    def mark_timeout(self) -> None:
+        """タイムアウトを記録する（ジョブの完了を待たずにステータスを更新）"""
+        self.timed_out = True
+        self._update(status=JobRunConstants.STATUS_TIMEOUT)
+
+    def finish(self) -> None:
+        if self.timed_out:
+            status = JobRunConstants.STATUS_TIMEOUT
+        elif self.failed:
+            status = JobRunConstants.STATUS_FAILED
+        else:
+            status = JobRunConstants.STATUS_SUCCEEDED
+        self._update(
+            status=status,
+            finished_at=timezone.now(),
+            duration_seconds=time.perf_counter() - self._started,
+            rows_processed=self.rows_processed,
+            error_message=self.error_message[
+                : JobRunConstants.MAX_ERROR_MESSAGE_LENGTH
+            ],
+        )
+
+    def _update(self, **fields) -> None:
+        from app.models import JobRun
+
+        if self._run_id is None:
+            return
+        try:
+            JobRun.objects.filter(id=self._run_id).update(**fields)
+        except Exception as e:
+            logger.warning(f"ジョブ実行履歴の更新エラー ({self.job_name}): {str(e)}")
+
+    @classmethod
+    def record_skipped(cls, job_name: str, source: str, reason: str) -> None:
+        """実行しなかったジョブ（前回の実行中など）を記録する"""
+        from app.models import JobRun
+
+        now = timezone.now()
+        try:
+            JobRun.objects.create(
+                job_name=job_name,
+                source=source,
+                status=JobRunConstants.STATUS_SKIPPED,
+                started_at=now,
+                finished_at=now,
+                duration_seconds=0,
+                error_message=reason,
+            )
+        except Exception as e:
+            logger.warning(f"ジョブ実行履歴の作成エラー ({job_name}): {str(e)}")
+
+
+@contextmanager
+def use_recorder(recorder: JobRunRecorder):
+    """recorder をこのスレッドの実行中ジョブとして記録を開始・終了する"""
+    recorder.start()
+    _local.recorder = recorder
+    try:
+        yield recorder
+    except Exception as e:
+        recorder.fail(str(e))
+        raise
+    finally:
+        _local.recorder = None
+        recorder.finish()
+
+
+@contextmanager
+def track_job_run(job_name: str):
+    """管理コマンドの実行を記録する
+
+    スケジューラーから実行された場合は、スケジューラーが作成した記録に
+    処理件数などを書き込む（1回の実行で記録が重複しないようにする）。
+    """
+    current = getattr(_local, "recorder", None)
+    if current is not None:
+        yield current
+        return
+    with use_recorder(JobRunRecorder(job_name)) as recorder:
+        yield recorder
+
+
+def record_job_run(job_name: str):
+    """管理コマンドの handle を track_job_run で囲むデコレーター"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_job_run(job_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def current_job_run() -> JobRunRecorder | None:
+    """このスレッドで実行中のジョブの記録を返す"""
+    return getattr(_local, "recorder", None)
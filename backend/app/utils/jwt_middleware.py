@@ -4,6 +4,8 @@ import jwt
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 
+from app.utils import principal_cache
+
 logger = logging.getLogger("app")
 
 
@@ -14,77 +16,70 @@ def get_user_model_lazy():
     return get_user_model()
 
 
+def authenticate_token(token: str):
+    """JWTアクセストークンからユーザーを取得する（認証できない場合は匿名ユーザー）
+
+    無効化（is_active=False）されたユーザーは匿名ユーザーとして扱う。
+    """
+    # 検証済みトークンであればデコードとユーザー取得を省略
+    cached_user = principal_cache.get_principal(token)
+    if cached_user is not None:
+        return cached_user
+
+    user_model = get_user_model_lazy()
+    user_id = None
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
+        user_id = payload.get("user_id")
+
+        if not user_id or payload.get("type") != "access":
+            logger.warning("JWTトークンのペイロードが無効")
+            return AnonymousUser()
+
+        version = principal_cache.get_user_version(user_id)
+        user = user_model.objects.get(id=user_id, is_active=True)
+        principal_cache.store_principal(token, payload, user, version)
+        logger.info(f"JWT認証成功: user_id={user_id}")
+        return user
+
+    except jwt.ExpiredSignatureError:
+        logger.warning("JWTトークンの有効期限切れ")
+    except jwt.InvalidTokenError:
+        logger.warning("無効なJWTトークン")
+    except user_model.DoesNotExist:
+        logger.warning(f"ユーザーが存在しないか無効です: user_id={user_id}")
+    except Exception as e:
+        logger.error(f"JWT認証エラー: {str(e)}")
+    return AnonymousUser()
+
+
 class JWTAuthenticationMiddleware:
-    """JWT認証に対応したGraphQLミドルウェア"""
-
-    def __init__(self):
-        # 初期化時にはUserモデルを設定しない
-        pass
-
-    def _get_user_model(self):
-        """遅延的にUserモデルを取得"""
-        return get_user_model_lazy()
-
-    def resolve(self, next, root, info, **args):
-        """GraphQLリゾルバーでJWTトークンからユーザーを取得"""
-        try:
-            # リクエストオブジェクトを取得
-            request = info.context
-
-            # 既に認証済みの場合はスキップ
-            if hasattr(request, "_jwt_authenticated"):
-                return next(root, info, **args)
-
-            # Authorizationヘッダーからトークンを取得
-            auth_header = request.META.get("HTTP_AUTHORIZATION", "")
-
-            if auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-
-                # JWTトークンの検証
-                try:
-                    payload = jwt.decode(
-                        token, settings.JWT_SECRET, algorithms=["HS256"]
-                    )
-                    user_id = payload.get("user_id")
-
-                    if user_id and payload.get("type") == "access":
-                        # ユーザーを取得
-                        user_model = self._get_user_model()
-                        user = user_model.objects.get(id=user_id)
-                        request.user = user
-                        # 認証済みフラグを設定
-                        request._jwt_authenticated = True
-                        logger.info(f"JWT認証成功: user_id={user_id}")
-                    else:
-                        request.user = AnonymousUser()
-                        request._jwt_authenticated = True
-                        logger.warning("JWTトークンのペイロードが無効")
-
-                except jwt.ExpiredSignatureError:
-                    request.user = AnonymousUser()
-                    request._jwt_authenticated = True
-                    logger.warning("JWTトークンの有効期限切れ")
-                except jwt.InvalidTokenError:
-                    request.user = AnonymousUser()
-                    request._jwt_authenticated = True
-                    logger.warning("無効なJWTトークン")
-                except self._get_user_model().DoesNotExist:
-                    request.user = AnonymousUser()
-                    request._jwt_authenticated = True
-                    logger.warning(f"ユーザーが存在しません: user_id={user_id}")
-                except Exception as e:
-                    request.user = AnonymousUser()
-                    request._jwt_authenticated = True
-                    logger.error(f"JWT認証エラー: {str(e)}")
-            else:
-                # トークンがない場合は匿名ユーザー
+    """JWT認証を行うDjangoミドルウェア
+
+    GraphQLの実行前にリクエストごとに1回だけ request.user を設定する
+    （GraphQLミドルウェアとして登録すると全フィールドのリゾルバーを包むため）。
+
+    - Bearer トークンがある場合はトークンのユーザー（無効なら匿名ユーザー）
+    - トークンがなく JWT_AUTH_PATH_PREFIXES 配下のパスの場合は匿名ユーザー
+      （GraphQL APIではセッションによる認証を使わない）
+    - それ以外（管理画面など）はセッション認証の結果をそのまま使う
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.path_prefixes = tuple(
+            getattr(settings, "JWT_AUTH_PATH_PREFIXES", ["/graphql/"])
+        )
+
+    def __call__(self, request):
+        auth_header = request.META.get("HTTP_AUTHORIZATION", "")
+        if auth_header.startswith("Bearer "):
+            try:
+                request.user = authenticate_token(auth_header.split(" ")[1])
+            except Exception as e:
+                logger.error(f"JWTミドルウェアエラー: {str(e)}")
                 request.user = AnonymousUser()
-                request._jwt_authenticated = True
-
-        except Exception as e:
-            logger.error(f"JWTミドルウェアエラー: {str(e)}")
+        elif request.path_info.startswith(self.path_prefixes):
             request.user = AnonymousUser()
-            request._jwt_authenticated = True
 
-        return next(root, info, **args)
+        return self.get_response(request)
@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, transaction
+from django.utils.connection import ConnectionProxy
+
+logger = logging.getLogger("app")
+
+# バージョンとページは全ワーカーで共有する必要があるため、ワーカー単位の
+# default ではなく shared キャッシュを使う（app/checks.py で設定を確認）
+cache = ConnectionProxy(caches, settings.SHARED_CACHE_ALIAS)
+
+VERSION_KEY = "leaderboard:version"
+PAGE_KEY_FORMAT = "leaderboard:page:{limit}:{offset}"
+REFRESH_LOCK_KEY_FORMAT = "leaderboard:refresh:{limit}:{offset}"
+
+
+def _fresh_seconds() -> int:
+    return getattr(settings, "LEADERBOARD_CACHE_FRESH_SECONDS", 30)
+
+
+def _stale_seconds() -> int:
+    return getattr(settings, "LEADERBOARD_CACHE_STALE_SECONDS", 300)
+
+
+def _swr_enabled() -> bool:
+    return getattr(settings, "LEADERBOARD_CACHE_STALE_WHILE_REVALIDATE", True)
+
+
+def get_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate() -> None:
+    """ランキング書き込み後に呼び出し、キャッシュ済みページを無効化する
+
+    ページ自体は削除せずバージョンを進めるため、SWR有効時は古いページを返しつつ再生成できる。
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # バージョンキーが未作成の場合
+        cache.add(VERSION_KEY, 2, None)
+    except Exception as e:
+        logger.warning(f"ランキングキャッシュ無効化エラー: {str(e)}")
+
+
+def invalidate_on_commit() -> None:
+    """トランザクションのコミット後に無効化する"""
+    transaction.on_commit(invalidate)
+
+
+def _load_rows(limit: int, offset: int) -> list[dict]:
+    from app.models.ranking import Ranking
+
+    rankings = (
+        Ranking.objects.filter(user__is_active=True)
+        .select_related("user")
+        .only(
+            "ranking",
+            "created_at",
+            "updated_at",
+            "user__id",
+            "user__name",
+            "user__icon",
+            "user__gold",
+        )[offset : offset + limit]
+    )
+    return [
+        {
+            "ranking": ranking.ranking,
+            "created_at": ranking.created_at,
+            "updated_at": ranking.updated_at,
+            "user_id": ranking.user.id,
+            "name": ranking.user.name,
+            "icon": ranking.user.icon,
+            "gold": ranking.user.gold,
+        }
+        for ranking in rankings
+    ]
+
+
+def _to_rankings(rows: list[dict]) -> list:
+    """キャッシュした行を RankingType が解決できる未保存のモデルに戻す"""
+    from app.models.ranking import Ranking
+    from app.models.user import User
+
+    return [
+        Ranking(
+            ranking=row["ranking"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            user=User(
+                id=row["user_id"],
+                name=row["name"],
+                icon=row["icon"],
+                gold=row["gold"],
+            ),
+        )
+        for row in rows
+    ]
+
+
+def _store(limit: int, offset: int, version: int) -> list[dict]:
+    rows = _load_rows(limit, offset)
+    entry = {
+        "version": version,
+        "fresh_until": time.time() + _fresh_seconds(),
+        "rows": rows,
+    }
+    cache.set(
+        PAGE_KEY_FORMAT.format(limit=limit, offset=offset),
+        entry,
+        _fresh_seconds() + _stale_seconds(),
+    )
+    return rows
+
+
+def _refresh_in_background(limit: int, offset: int, version: int) -> None:
+    lock_key = REFRESH_LOCK_KEY_FORMAT.format(limit=limit, offset=offset)
+    # 同じページの再生成は1つだけ走らせる
+    if not cache.add(lock_key, 1, _fresh_seconds()):
+        return
+
+    def run():
+        try:
+            _store(limit, offset, version)
+        except Exception as e:
+            logger.warning(f"ランキングキャッシュ再生成エラー: {str(e)}")
+        finally:
+            cache.delete(lock_key)
+            close_old_connections()
+
+    threading.Thread(target=run, name="leaderboard-refresh", daemon=True).start()
+
+
+def get_page(limit: int, offset: int) -> list:
+    """ランキングページを取得する（キャッシュ優先）
+
+    - 最新バージョンかつ fresh 期間内: キャッシュをそのまま返す
+    - 古いがキャッシュに残っている: SWR有効時は古いページを返し、裏で再生成
+    - キャッシュなし: 同期で取得して保存
+    """
+    version = get_version()
+    entry = cache.get(PAGE_KEY_FORMAT.format(limit=limit, offset=offset))
+
+    if entry is not None:
+        is_fresh = entry["version"] == version and time.time() < entry["fresh_until"]
+        if is_fresh:
+            return _to_rankings(entry["rows"])
+        if _swr_enabled():
+            logger.debug(f"ランキングキャッシュ再検証: limit={limit}, offset={offset}")
+            _refresh_in_background(limit, offset, version)
+            return _to_rankings(entry["rows"])
+
+    return _to_rankings(_store(limit, offset, version))
@@ -0,0 +1,125 @@
+import logging
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger("app")
+
+# gunicorn の複数ワーカーの値を集計するため、PROMETHEUS_MULTIPROC_DIR が
+# 設定されている場合は各メトリクスをワーカーごとのファイルに記録する
+# （prometheus_client の import 前に設定されている必要がある。start.sh を参照）
+
+BETS_CREATED = Counter(
+    "typeandbet_bets_created",
+    "作成されたベットの件数",
+)
+SCORES_SUBMITTED = Counter(
+    "typeandbet_scores_submitted",
+    "登録されたスコアの件数",
+)
+GOLD_TRANSFERRED = Counter(
+    "typeandbet_gold_transferred",
+    "移動したゴールドの量（bet: 掛け金, payout: 払い戻し, loss: 没収）",
+    ["kind"],
+)
+THROTTLE_REJECTIONS = Counter(
+    "typeandbet_throttle_rejections",
+    "レート制限で拒否されたリクエストの件数",
+    ["action"],
+)
+MUTATION_LATENCY = Histogram(
+    "typeandbet_graphql_mutation_duration_seconds",
+    "GraphQLミューテーションの処理時間（秒）",
+    ["mutation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+def record_bet_created(bet_gold: int) -> None:
+    BETS_CREATED.inc()
+    GOLD_TRANSFERRED.labels(kind="bet").inc(bet_gold)
+
+
+def record_score_submitted(gold_delta: int) -> None:
+    """スコア登録を記録する（gold_delta は実際に反映された所持金の増減）"""
+    SCORES_SUBMITTED.inc()
+    if gold_delta > 0:
+        GOLD_TRANSFERRED.labels(kind="payout").inc(gold_delta)
+    elif gold_delta < 0:
+        GOLD_TRANSFERRED.labels(kind="loss").inc(-gold_delta)
+
+
+def record_throttle_rejection(action: str) -> None:
+    THROTTLE_REJECTIONS.labels(action=action).inc()
+
+
+class TextPipelineCollector:
+    """文章パイプラインの状況を取得時にDBから集計するコレクター
+
+    プール残数と未変換件数はワーカーごとに持つ値ではないため、
+    ファイルには記録せず、取得のたびに1回の集計クエリで求める。
+    """
+
+    def collect(self):
+        from app.utils.text_pool_policy import get_pool_depth
+
+        try:
+            converted, unconverted = get_pool_depth()
+        except Exception as e:
+            logger.warning(f"メトリクス集計エラー（文章プール）: {str(e)}")
+            return
+        yield GaugeMetricFamily(
+            "typeandbet_text_pool_depth",
+            "配信可能な（変換済みの）文章数",
+            value=converted,
+        )
+        yield GaugeMetricFamily(
+            "typeandbet_text_conversion_backlog",
+            "ひらがな変換待ちの文章数",
+            value=unconverted,
+        )
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_latest() -> tuple[bytes, str]:
+    """テキスト形式のメトリクスと Content-Type を返す"""
+    if is_multiprocess():
+        # 全ワーカー（終了済みのワーカーを含む）のファイルを集計する
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    pipeline = CollectorRegistry()
+    pipeline.register(TextPipelineCollector())
+    return generate_latest(registry) + generate_latest(pipeline), CONTENT_TYPE_LATEST
+
+
+class MutationMetricsMiddleware:
+    """GraphQLミューテーションの処理時間を記録するGraphQLミドルウェア
+
+    ルートのミューテーションフィールドのみを対象とし、それ以外は素通りする。
+    """
+
+    def resolve(self, next, root, info, **args):
+        if info.parent_type is not info.schema.mutation_type:
+            return next(root, info, **args)
+        started = time.perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            MUTATION_LATENCY.labels(mutation=info.field_name).observe(
+                time.perf_counter() - started
+            )
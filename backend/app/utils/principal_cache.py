@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.connection import ConnectionProxy
+
+logger = logging.getLogger("app")
+
+# User.save による無効化を全ワーカーへ伝えるため、shared キャッシュに置く
+cache = ConnectionProxy(caches, settings.SHARED_CACHE_ALIAS)
+
+PRINCIPAL_KEY_FORMAT = "jwt:principal:{signature}"
+USER_VERSION_KEY_FORMAT = "jwt:user_version:{user_id}"
+
+# キャッシュするユーザー情報（それ以外の項目は参照時に遅延読み込みされる）
+SNAPSHOT_FIELDS = ("id", "gold", "is_active", "is_staff")
+
+
+def _max_seconds() -> int:
+    return getattr(settings, "JWT_PRINCIPAL_CACHE_SECONDS", 300)
+
+
+def _split_token(token: str) -> tuple[str, str] | None:
+    """トークンを署名対象部分（header.payload）と署名に分割する"""
+    signing_input, _, signature = token.rpartition(".")
+    if not signing_input or not signature:
+        return None
+    return signing_input, signature
+
+
+def _digest(signing_input: str) -> str:
+    return hashlib.sha256(signing_input.encode("utf-8")).hexdigest()
+
+
+def get_user_version(user_id) -> int:
+    key = USER_VERSION_KEY_FORMAT.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def get_principal(token: str):
+    """検証済みトークンのユーザーをキャッシュから取得する（なければNone）
+
+    キャッシュ登録時に署名・有効期限を検証済みのため、署名と署名対象部分が
+    一致し、有効期限内かつユーザーのバージョンが変わっていなければ
+    jwt.decode とユーザー取得を省略できる。
+    所持金はスナップショット時点の値のため、所持金を書き換える処理は
+    select_for_update で取得し直すこと。
+    """
+    parts = _split_token(token)
+    if parts is None:
+        return None
+    signing_input, signature = parts
+
+    entry = cache.get(PRINCIPAL_KEY_FORMAT.format(signature=signature))
+    if entry is None:
+        return None
+    if entry["digest"] != _digest(signing_input) or time.time() >= entry["exp"]:
+        return None
+    if get_user_version(entry["user_id"]) != entry["version"]:
+        # ユーザー情報の変更で無効化済み
+        return None
+
+    from app.models import User
+
+    return User.from_db("default", SNAPSHOT_FIELDS, entry["values"])
+
+
+def store_principal(token: str, payload: dict, user, version: int) -> None:
+    """検証済みトークンとユーザーのスナップショットを登録する
+
+    version はユーザーを取得する前に読んだ値を渡す（取得後に更新された場合に
+    古いスナップショットが新しいバージョンで登録されないようにするため）。
+    有効期間はトークンの exp と JWT_PRINCIPAL_CACHE_SECONDS の短い方とする。
+    """
+    parts = _split_token(token)
+    exp = payload.get("exp")
+    if parts is None or exp is None:
+        return
+    signing_input, signature = parts
+
+    timeout = min(int(exp - time.time()), _max_seconds())
+    if timeout <= 0:
+        return
+    try:
+        cache.set(
+            PRINCIPAL_KEY_FORMAT.format(signature=signature),
+            {
+                "digest": _digest(signing_input),
+                "exp": exp,
+                "user_id": user.id,
+                "version": version,
+                "values": tuple(getattr(user, field) for field in SNAPSHOT_FIELDS),
+            },
+            timeout,
+        )
+    except Exception as e:
+        logger.warning(f"認証キャッシュ登録エラー: {str(e)}")
+
+
+def invalidate_user(user_id) -> None:
+    """ユーザーのキャッシュ済み認証情報をすべて無効化する
+
+    トークンごとのキーは列挙できないため、ユーザー単位のバージョンを進める。
+    """
+    key = USER_VERSION_KEY_FORMAT.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # バージョンキーが未作成の場合
+        cache.add(key, 2, None)
+    except Exception as e:
+        logger.warning(f"認証キャッシュ無効化エラー: {str(e)}")
+
+
+def invalidate_user_on_commit(user_id) -> None:
+    """トランザクションのコミット後に無効化する"""
+    transaction.on_commit(lambda: invalidate_user(user_id))
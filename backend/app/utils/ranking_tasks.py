@@ -0,0 +1,124 @@
+import base64
+import logging
+import pickle
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import close_old_connections, connections, router
+from django.utils.connection import ConnectionProxy
+
+logger = logging.getLogger("app")
+
+# 他ワーカーとの排他に使うため、ワーカー単位ではなく共有キャッシュに置く
+cache = ConnectionProxy(caches, settings.SHARED_CACHE_ALIAS)
+
+RECOMPUTE_LOCK_KEY = "ranking:recompute:lock"
+
+_timer: threading.Timer | None = None
+_timer_lock = threading.Lock()
+
+
+def schedule_rankings_recompute() -> None:
+    """ランキング一括再計算をデバウンスして予約する
+
+    待機中の予約があれば何もしないため、短時間に発生した多数のゴールド変動は
+    1回の再計算にまとめられる。コミット後に呼び出すこと（transaction.on_commit）。
+    """
+    global _timer
+
+    delay = getattr(settings, "RANKING_RECOMPUTE_DEBOUNCE_SECONDS", 5)
+    with _timer_lock:
+        if _timer is not None and _timer.is_alive():
+            return
+        _timer = threading.Timer(delay, _run_recompute)
+        _timer.daemon = True
+        _timer.start()
+    logger.debug(f"ランキング一括再計算を予約: delay={delay}s")
+
+
+def _run_recompute() -> None:
+    global _timer
+
+    with _timer_lock:
+        _timer = None
+
+    try:
+        _recompute_with_lock()
+    finally:
+        close_old_connections()
+
+
+def _recompute_with_lock() -> None:
+    lock_timeout = getattr(settings, "RANKING_RECOMPUTE_LOCK_SECONDS", 60)
+    token = uuid.uuid4().hex
+    if not cache.add(RECOMPUTE_LOCK_KEY, token, lock_timeout):
+        # 実行中の再計算はこのワーカーの変更を読む前に始まった可能性があるため、
+        # 同じ間隔で予約し直し、ロックの解放後に改めて再計算する
+        logger.info("ランキング一括再計算は他プロセスで実行中のため再予約")
+        schedule_rankings_recompute()
+        return
+
+    try:
+        from app.models import User
+
+        User.update_rankings()
+    except Exception as e:
+        logger.error(f"ランキング一括再計算エラー: {str(e)}", exc_info=True)
+    finally:
+        if not _release_lock(token):
+            logger.warning("ランキング一括再計算のロックが期限切れのため解放をスキップ")
+
+
+def _release_lock(token: str) -> bool:
+    """自分が取得したロックのみ解放する（解放した場合は True）
+
+    再計算が lock_timeout を超えた場合、ロックは期限切れで他ワーカーが
+    取得し直している可能性があるため、値がトークンと一致するときだけ削除する。
+    DBキャッシュと Redis では比較と削除を1回の操作で行う。それ以外の
+    バックエンドでは get と delete の間に再取得される余地が残るため、
+    ロックは重複実行を減らすための目安として扱う（再計算は冪等）。
+    """
+    backend = caches[settings.SHARED_CACHE_ALIAS]
+    key = backend.make_and_validate_key(RECOMPUTE_LOCK_KEY)
+    if isinstance(backend, DatabaseCache):
+        return _delete_if_equal_db(backend, key, token)
+    if isinstance(backend, RedisCache):
+        client = backend._cache.get_client(key, write=True)
+        value = backend._cache._serializer.dumps(token)
+        return bool(client.eval(_REDIS_DELETE_IF_EQUAL, 1, key, value))
+
+    if backend.get(RECOMPUTE_LOCK_KEY) != token:
+        return False
+    backend.delete(RECOMPUTE_LOCK_KEY)
+    return True
+
+
+# 値が一致する場合のみキーを削除する
+_REDIS_DELETE_IF_EQUAL = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _delete_if_equal_db(backend: DatabaseCache, key: str, token: str) -> bool:
+    """DBキャッシュの行を値が一致する場合のみ削除する
+
+    DatabaseCache と同じ形式（pickle を base64 化した文字列）で値を比較する。
+    """
+    value = base64.b64encode(pickle.dumps(token, backend.pickle_protocol))
+    db = router.db_for_write(backend.cache_model_class)
+    connection = connections[db]
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote_name(backend._table)} "
+            f"WHERE {quote_name('cache_key')} = %s AND {quote_name('value')} = %s",
+            [key, value.decode("latin1")],
+        )
+        return cursor.rowcount > 0
@@ -0,0 +1,195 @@
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+
+import MeCab
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+logger = logging.getLogger("app")
+
+# 再起動後や他ワーカーでも試行を省略できるよう、shared キャッシュに保存する
+cache = ConnectionProxy(caches, settings.SHARED_CACHE_ALIAS)
+
+# MeCab.Tagger の初期化で試行するオプション（先頭から順に試す）
+TAGGER_OPTIONS = [
+    "",
+    "-Owakati",
+    "-d /usr/lib/mecab/dic/ipadic",
+    "-d /var/lib/mecab/dic/ipadic",
+]
+
+# 初期化に成功したオプションを保存するキャッシュキー
+TAGGER_OPTION_CACHE_KEY = "mecab:tagger_option"
+
+# IPA辞書の素性における読み（カタカナ）の位置
+READING_FEATURE_INDEX = 7
+
+# 文頭・文末ノード（MECAB_BOS_NODE / MECAB_EOS_NODE）
+_BOUNDARY_NODE_STATS = (2, 3)
+
+# カタカナ（ァ〜ヶ）→ひらがな（ぁ〜ゖ）の変換テーブル
+KATAKANA_TO_HIRAGANA_TABLE = str.maketrans(
+    {chr(code): chr(code - 0x60) for code in range(ord("ァ"), ord("ヶ") + 1)}
+)
+
+
+def katakana_to_hiragana(text: str) -> str:
+    """カタカナをひらがなに変換する"""
+    return text.translate(KATAKANA_TO_HIRAGANA_TABLE)
+
+
+@lru_cache(maxsize=65536)
+def reading_for_token(surface: str, feature: str) -> str:
+    """形態素（表層形と素性）の読みをひらがなで返す
+
+    同じ形態素は文章をまたいで繰り返し現れるため結果をキャッシュする。
+    読みは文脈で変わりうるため、表層形だけでなく素性もキーに含める。
+    """
+    features = feature.split(",")
+    if len(features) > READING_FEATURE_INDEX and features[READING_FEATURE_INDEX] != "*":
+        return katakana_to_hiragana(features[READING_FEATURE_INDEX])
+    # 読み仮名がない場合は表層形をそのまま使用
+    return surface
+
+
+class ReadingEngine:
+    """MeCabのノードAPIで漢字文章をひらがな文章に変換するエンジン
+
+    lock を渡した場合は解析からノードの走査までを排他する
+    （Taggerは内部のラティスを使い回すため、スレッド間で同時に解析できない）。
+    """
+
+    def __init__(self, tagger, lock=None):
+        self.tagger = tagger
+        self.lock = lock
+
+    def to_hiragana(self, text: str) -> str:
+        if self.lock is None:
+            return self._to_hiragana(text)
+        with self.lock:
+            return self._to_hiragana(text)
+
+    def _to_hiragana(self, text: str) -> str:
+        parts = []
+        node = self.tagger.parseToNode(text)
+        while node:
+            if node.stat not in _BOUNDARY_NODE_STATS:
+                parts.append(reading_for_token(node.surface, node.feature))
+            node = node.next
+        return "".join(parts)
+
+    @staticmethod
+    def cache_info():
+        return reading_for_token.cache_info()
+
+
+class TaggerProvider:
+    """プロセス内で共有する MeCab.Tagger のプロバイダー
+
+    - 最初に使われたときに1度だけ辞書を読み込み、以降は同じTaggerを返す
+    - 初期化に成功したオプションを記憶（shared キャッシュにも保存し、
+      再起動後や他のワーカーでも共有する）し、次回は最初に試す
+    - gunicorn のスレッド間で共有するため、初期化と解析はロックで排他する
+    - fork 後の子プロセスでは記憶したオプションで作り直す（試行は省略される）
+    """
+
+    def __init__(self, options: list[str]):
+        self.options = options
+        self._tagger = None
+        self._option = None
+        self._pid = None
+        self._init_lock = threading.Lock()
+        self._parse_lock = threading.Lock()
+        self._load_seconds = None
+        self._loaded_at = None
+        self._failed_options: list[str] = []
+        self._last_error = None
+
+    def get(self):
+        """Taggerを取得する（未初期化なら初期化）。初期化できない場合はNone"""
+        if self._pid == os.getpid() and self._tagger is not None:
+            return self._tagger
+        with self._init_lock:
+            if self._pid != os.getpid():
+                self._reset_after_fork()
+            if self._tagger is None:
+                self._load_locked()
+            return self._tagger
+
+    def engine(self) -> ReadingEngine | None:
+        """共有Taggerを使う ReadingEngine を返す。初期化できない場合はNone"""
+        tagger = self.get()
+        if tagger is None:
+            return None
+        return ReadingEngine(tagger, lock=self._parse_lock)
+
+    def report(self) -> dict:
+        """初期化状態・所要時間・読みキャッシュの状況を返す"""
+        return {
+            "status": "ok" if self._tagger is not None else "unavailable",
+            "pid": self._pid,
+            "option": self._option,
+            "load_seconds": self._load_seconds,
+            "loaded_at": self._loaded_at,
+            "failed_options": list(self._failed_options),
+            "last_error": self._last_error,
+            "reading_cache": reading_for_token.cache_info()._asdict(),
+        }
+
+    def _ordered_options(self) -> list[str]:
+        remembered = self._option
+        if remembered is None:
+            try:
+                remembered = cache.get(TAGGER_OPTION_CACHE_KEY)
+            except Exception as e:
+                logger.warning(f"MeCab設定キャッシュ取得エラー: {str(e)}")
+        if remembered not in self.options:
+            return list(self.options)
+        return [remembered] + [
+            option for option in self.options if option != remembered
+        ]
+
+    def _load_locked(self) -> None:
+        started = time.perf_counter()
+        self._failed_options = []
+        for tagger_option in self._ordered_options():
+            try:
+                logger.info(f"MeCab初期化試行: {tagger_option or 'デフォルト'}")
+                tagger = MeCab.Tagger(tagger_option)
+            except RuntimeError as e:
+                logger.warning(
+                    f"MeCab初期化失敗: {tagger_option or 'デフォルト'} - {str(e)}"
+                )
+                self._failed_options.append(tagger_option)
+                self._last_error = str(e)
+                continue
+
+            self._tagger = tagger
+            self._option = tagger_option
+            self._load_seconds = time.perf_counter() - started
+            self._loaded_at = time.time()
+            logger.info(
+                f"MeCab初期化成功: {tagger_option or 'デフォルト'} "
+                f"({self._load_seconds:.3f}秒)"
+            )
+            try:
+                cache.set(TAGGER_OPTION_CACHE_KEY, tagger_option, None)
+            except Exception as e:
+                logger.warning(f"MeCab設定キャッシュ保存エラー: {str(e)}")
+            return
+
+        self._load_seconds = time.perf_counter() - started
+
+    def _reset_after_fork(self) -> None:
+        # 親プロセスのロック状態やラティスを引き継がないよう作り直す
+        # （成功したオプションは保持する）
+        self._tagger = None
+        self._parse_lock = threading.Lock()
+        self._pid = os.getpid()
+
+
+tagger_provider = TaggerProvider(TAGGER_OPTIONS)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+from app.utils.constants import ScoreStatisticsConstants
+
+
+class ScoreDistribution:
+    """スコア分布の逐次集計クラス
+
+    - count / mean / M2 は Welford 法で逐次更新する
+    - 中央値は固定幅ヒストグラム（マージ可能なスケッチ）から補間で求める
+    - 全スコアを保持しないため、参照は履歴件数に依存せず O(バケット数) 以下
+    """
+
+    def __init__(
+        self,
+        count: int = 0,
+        mean: float = 0.0,
+        m2: float = 0.0,
+        histogram: dict | None = None,
+        bucket_width: int = ScoreStatisticsConstants.HISTOGRAM_BUCKET_WIDTH,
+    ):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.bucket_width = bucket_width
+        # JSON由来のキーは文字列のため int に正規化する
+        self.histogram = {int(k): int(v) for k, v in (histogram or {}).items()}
+
+    @classmethod
+    def from_scores(cls, scores: Iterable[int], **kwargs) -> "ScoreDistribution":
+        """スコア列から分布を構築する"""
+        distribution = cls(**kwargs)
+        for score in scores:
+            distribution.add(score)
+        return distribution
+
+    def add(self, score: int) -> None:
+        """スコアを1件追加する"""
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+
+        bucket = int(score) // self.bucket_width
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def merge(self, other: "ScoreDistribution") -> None:
+        """別の分布を結合する（Chanらの並列アルゴリズム）"""
+        if other.bucket_width != self.bucket_width:
+            raise ValueError("バケット幅が異なる分布は結合できません")
+        if other.count == 0:
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+
+        for bucket, bucket_count in other.histogram.items():
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + bucket_count
+
+    def std_dev(self) -> float:
+        """標本標準偏差（statistics.stdev と同じ n-1 除算）"""
+        if self.count < 2:
+            # 既存実装と同様、1件以下の場合は1とする
+            return 1
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+    def median(self) -> float:
+        """ヒストグラムから中央値を線形補間で推定する
+
+        推定値であり、statistics.median による正確な中央値とは最大で
+        バケット幅（HISTOGRAM_BUCKET_WIDTH）程度ずれる。Zスコアはこのずれを
+        標準偏差で割った分（通常は小さい）だけ既存実装と異なりうる。
+        """
+        if self.count == 0:
+            return 0.0
+
+        target = self.count / 2
+        cumulative = 0
+        for bucket in sorted(self.histogram):
+            bucket_count = self.histogram[bucket]
+            if cumulative + bucket_count >= target:
+                # バケット内で一様分布していると仮定して補間
+                fraction = (target - cumulative) / bucket_count
+                return (bucket + fraction) * self.bucket_width
+            cumulative += bucket_count
+        return float(max(self.histogram) + 1) * self.bucket_width
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "histogram": {str(k): v for k, v in self.histogram.items()},
+        }
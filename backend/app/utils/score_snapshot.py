@@ -0,0 +1,94 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from app.utils.score_distribution import ScoreDistribution
+
+logger = logging.getLogger("app")
+
+
+class ScoreSnapshot:
+    """プロセス内で共有するスコア分布のスナップショット
+
+    - 練習モードなど高頻度の読み取り専用計算で使用する
+    - 取得元は集計済みの score_statistics であり、gamesテーブルには触れない
+    - max_age 秒を超えて古くなった場合は読み取り時に同期で再取得する
+    - バックグラウンドスレッドが refresh_interval 秒ごとに先回りで更新する
+    """
+
+    def __init__(self, max_age: float, refresh_interval: float):
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self._distribution: ScoreDistribution | None = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        # gunicorn --preload で fork された後はスレッドが引き継がれないため PID で管理
+        self._refresher_pid = None
+
+    def get(self) -> ScoreDistribution:
+        """スナップショットを取得する（古すぎる場合のみ再取得）"""
+        self._ensure_refresher()
+        distribution = self._distribution
+        if distribution is None or self.age() > self.max_age:
+            with self._lock:
+                # ロック待ちの間に他スレッドが更新済みなら再取得しない
+                if self._distribution is None or self.age() > self.max_age:
+                    try:
+                        self._refresh_locked()
+                    except Exception as e:
+                        # 取得済みのスナップショットがあれば古くても返す
+                        if self._distribution is None:
+                            raise
+                        logger.warning(f"スコアスナップショット再取得失敗: {str(e)}")
+                distribution = self._distribution
+        return distribution
+
+    def age(self) -> float:
+        return time.monotonic() - self._fetched_at
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self) -> None:
+        from app.models import ScoreStatistics
+
+        self._distribution = ScoreStatistics.load_distribution()
+        self._fetched_at = time.monotonic()
+        logger.debug(f"スコアスナップショット更新: count={self._distribution.count}")
+
+    def _ensure_refresher(self) -> None:
+        if self.refresh_interval <= 0 or self._refresher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._refresher_pid == os.getpid():
+                return
+            thread = threading.Thread(
+                target=self._refresh_loop,
+                name="score-snapshot-refresher",
+                daemon=True,
+            )
+            thread.start()
+            self._refresher_pid = os.getpid()
+
+    def _refresh_loop(self) -> None:
+        from django.db import close_old_connections
+
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"スコアスナップショット更新エラー: {str(e)}")
+            finally:
+                # スレッド専用のDB接続を保持し続けないようにする
+                close_old_connections()
+
+
+score_snapshot = ScoreSnapshot(
+    max_age=getattr(settings, "SCORE_SNAPSHOT_MAX_AGE_SECONDS", 300),
+    refresh_interval=getattr(settings, "SCORE_SNAPSHOT_REFRESH_INTERVAL_SECONDS", 60),
+)
@@ -0,0 +1,81 @@
+import random
+import time
+
+# オフライン生成で組み合わせる語句
+_SUBJECTS = [
+    "猫",
+    "先生",
+    "祖母",
+    "子供達",
+    "旅人",
+    "料理人",
+    "宇宙飛行士",
+    "郵便屋さん",
+    "図書館の司書",
+    "隣の犬",
+    "魔法使い",
+    "新入社員",
+]
+_PLACES = [
+    "公園で",
+    "駅前で",
+    "海辺で",
+    "台所で",
+    "山頂で",
+    "教室で",
+    "月面で",
+    "商店街で",
+    "森の奥で",
+    "屋上で",
+]
+_PREDICATES = [
+    "昼寝をした。",
+    "歌を歌った。",
+    "本を読んだ。",
+    "空を見上げた。",
+    "料理を作った。",
+    "手紙を書いた。",
+    "星を数えた。",
+    "傘を忘れた。",
+    "地図を広げた。",
+    "笑い転げた。",
+]
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """generate_content だけを実装したオフライン用のスタブモデル
+
+    GEMINI_MODEL=stub の場合や動作確認時に、外部APIを呼ばずに文章生成を行う。
+    latency で応答遅延、failure_rate で一時的なエラーを再現できる。
+    """
+
+    def __init__(
+        self,
+        sentences_per_call: int = 100,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.sentences_per_call = sentences_per_call
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+
+    def generate_content(self, prompt: str) -> StubResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise RuntimeError("スタブモデルの一時的なエラー")
+        sentences = [
+            self._random.choice(_SUBJECTS)
+            + "が"
+            + self._random.choice(_PLACES)
+            + self._random.choice(_PREDICATES)
+            for _ in range(self.sentences_per_call)
+        ]
+        return StubResponse("\n".join(sentences))
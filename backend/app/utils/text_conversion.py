@@ -0,0 +1,163 @@
+import logging
+import multiprocessing
+from itertools import islice
+from typing import Callable
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from app.utils.constants import TextConversionConstants
+from app.utils.reading_engine import tagger_provider
+
+logger = logging.getLogger("app")
+
+# 並列変換時に子プロセスごとに1回だけ初期化する変換エンジン
+_worker_engine = None
+
+
+def _init_worker():
+    """子プロセスの初期化（親プロセスで成功したオプションでTaggerを1度だけ生成）"""
+    global _worker_engine
+    # 初期化で例外を送出するとPoolが子プロセスを再生成し続けるため、
+    # 失敗時は各行の変換エラーとして扱う
+    _worker_engine = tagger_provider.engine()
+
+
+def _convert_chunk_in_worker(chunk):
+    """子プロセスでチャンクを変換する"""
+    if _worker_engine is None:
+        message = "MeCabの初期化に失敗しました"
+        return [], [(text_pair_id, message) for text_pair_id, _ in chunk]
+    return convert_chunk(_worker_engine.to_hiragana, chunk)
+
+
+def _iter_unconverted_chunks(chunk_size: int):
+    """未変換の (id, kanji) を chunk_size 件ずつ返すジェネレーター"""
+    from app.models.game import TextPair
+
+    rows = (
+        TextPair.objects.filter(TextPair.pending_conversion())
+        .order_by("id")
+        .values_list("id", "kanji")
+        .iterator(chunk_size=chunk_size)
+    )
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write_converted(results: list[tuple[int, str]]) -> int:
+    """変換結果 (id, hiragana) を1回の bulk_update で書き込みコミットする"""
+    from app.models.game import TextPair
+
+    now = timezone.now()
+    text_pairs = [
+        TextPair(id=text_pair_id, hiragana=hiragana, is_converted=True, updated_at=now)
+        for text_pair_id, hiragana in results
+    ]
+    with transaction.atomic():
+        TextPair.objects.bulk_update(
+            text_pairs, ["hiragana", "is_converted", "updated_at"]
+        )
+    return len(text_pairs)
+
+
+def _mark_failed(errors: list[tuple[int, str]]) -> None:
+    """変換に失敗した行の失敗日時を記録し、一定時間再試行の対象から外す"""
+    from app.models.game import TextPair
+
+    TextPair.objects.filter(id__in=[text_pair_id for text_pair_id, _ in errors]).update(
+        conversion_failed_at=timezone.now()
+    )
+
+
+def convert_chunk(
+    convert: Callable[[str], str], chunk: list[tuple[int, str]]
+) -> tuple[list[tuple[int, str]], list[tuple[int, str]]]:
+    """チャンク内の各文章を変換する
+
+    Returns:
+        tuple: (変換結果 [(id, hiragana)], 変換エラー [(id, エラーメッセージ)])
+    """
+    results = []
+    errors = []
+    for text_pair_id, kanji in chunk:
+        try:
+            results.append((text_pair_id, convert(kanji)))
+        except Exception as e:
+            errors.append((text_pair_id, str(e)))
+    return results, errors
+
+
+def _collect(results, errors, counts: list[int]) -> None:
+    for text_pair_id, message in errors:
+        logger.error(f"個別変換エラー (ID: {text_pair_id}): {message}")
+    counts[0] += _write_converted(results)
+    if errors:
+        _mark_failed(errors)
+    counts[1] += len(errors)
+    logger.info(f"ひらがな変換チャンク完了: {len(results)}件 (累計 {counts[0]}件)")
+
+
+def convert_unconverted_text_pairs(
+    convert: Callable[[str], str],
+    chunk_size: int = TextConversionConstants.CHUNK_SIZE,
+) -> tuple[int, int]:
+    """未変換のTextPairをチャンク単位でひらがな化して一括更新する
+
+    - iterator() で未変換行を chunk_size 件ずつ読み込み、全件をメモリに載せない
+    - チャンクごとに bulk_update してコミットするため、途中で失敗しても
+      それまでの変換結果は失われず、ロック時間もチャンク単位に収まる
+    - 個別の変換エラーはその行のみスキップし、失敗日時を記録して
+      FAILURE_BACKOFF_SECONDS 経過後のジョブで再試行する
+
+    Args:
+        convert: 漢字文章をひらがな文章に変換する関数
+
+    Returns:
+        tuple[int, int]: (変換件数, 変換エラー件数)
+    """
+    counts = [0, 0]
+    for chunk in _iter_unconverted_chunks(chunk_size):
+        results, errors = convert_chunk(convert, chunk)
+        _collect(results, errors, counts)
+    return counts[0], counts[1]
+
+
+def convert_unconverted_text_pairs_parallel(
+    workers: int,
+    chunk_size: int = TextConversionConstants.CHUNK_SIZE,
+) -> tuple[int, int]:
+    """未変換のTextPairを複数プロセスで変換する
+
+    - 読み込みと書き込みは親プロセスのみが行い（単一ライター）、
+      子プロセスは渡されたチャンクの変換だけを担当する
+    - MeCab.Tagger は子プロセスごとに1回だけ初期化する
+    - 処理中のチャンクは workers * 2 件までに抑え、メモリ使用量を制限する
+
+    Args:
+        workers: 子プロセス数
+
+    Returns:
+        tuple[int, int]: (変換件数, 変換エラー件数)
+    """
+    # fork 前にDB接続を閉じ、子プロセスへ接続が引き継がれないようにする
+    connections.close_all()
+    context = multiprocessing.get_context("fork")
+
+    counts = [0, 0]
+    max_in_flight = workers * 2
+    with context.Pool(processes=workers, initializer=_init_worker) as pool:
+        in_flight = []
+        for chunk in _iter_unconverted_chunks(chunk_size):
+            in_flight.append(pool.apply_async(_convert_chunk_in_worker, (chunk,)))
+            if len(in_flight) >= max_in_flight:
+                results, errors = in_flight.pop(0).get()
+                _collect(results, errors, counts)
+        for pending in in_flight:
+            results, errors = pending.get()
+            _collect(results, errors, counts)
+
+    return counts[0], counts[1]
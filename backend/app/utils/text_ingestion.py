@@ -0,0 +1,93 @@
+import hashlib
+import logging
+import re
+import unicodedata
+from datetime import timedelta
+from typing import Callable
+
+from django.utils import timezone
+
+from app.utils.constants import TextIngestionConstants
+
+logger = logging.getLogger("app")
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_sentence(text: str) -> str:
+    """生成された1行を保存用に整形する（前後の空白除去・連続空白の圧縮）"""
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def content_hash(sentence: str) -> str:
+    """重複判定用のハッシュ（全角・半角の違いと空白を無視する）"""
+    key = _WHITESPACE_PATTERN.sub("", unicodedata.normalize("NFKC", sentence))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _build_text_pair(model, sentence: str, sentence_hash: str, convert):
+    if convert is not None:
+        try:
+            return model(
+                kanji=sentence,
+                hiragana=convert(sentence),
+                content_hash=sentence_hash,
+                is_converted=True,
+            )
+        except Exception as e:
+            logger.error(f"取り込み時のひらがな変換エラー: {str(e)}")
+    return model(kanji=sentence, content_hash=sentence_hash, is_converted=False)
+
+
+def ingest_sentences(
+    lines: list[str], convert: Callable[[str], str] | None = None
+) -> list[dict]:
+    """生成された文章を正規化・重複除去し、1回の bulk_create で保存する
+
+    - バッチ内の重複と、直近 DEDUP_LOOKBACK_DAYS 日以内の既存文章との重複を
+      content_hash で判定して除外する
+    - text_pairs はパーティションテーブルのため一意制約は使わず、
+      取り込み時の判定で重複を防ぐ
+    - convert を渡した場合はその場でひらがな化し、変換済み（is_converted=True）
+      として保存する。変換に失敗した文章は未変換のまま保存し、変換ジョブで補う
+
+    Args:
+        lines: 生成された文章（1行1文）
+        convert: 漢字文章をひらがな文章に変換する関数
+
+    Returns:
+        list[dict]: 保存した文章 [{"text": 文章, "id": TextPairのID}]
+    """
+    from app.models.game import TextPair
+
+    candidates = {}
+    for line in lines:
+        sentence = normalize_sentence(line)
+        if not sentence:
+            continue
+        candidates.setdefault(content_hash(sentence), sentence)
+
+    if not candidates:
+        return []
+
+    cutoff = timezone.now() - timedelta(days=TextIngestionConstants.DEDUP_LOOKBACK_DAYS)
+    existing = set(
+        TextPair.objects.filter(
+            content_hash__in=list(candidates), created_at__gte=cutoff
+        ).values_list("content_hash", flat=True)
+    )
+
+    text_pairs = [
+        _build_text_pair(TextPair, sentence, sentence_hash, convert)
+        for sentence_hash, sentence in candidates.items()
+        if sentence_hash not in existing
+    ]
+    created = TextPair.objects.bulk_create(text_pairs)
+
+    skipped_count = len(lines) - len(created)
+    converted_count = sum(1 for text_pair in created if text_pair.is_converted)
+    logger.info(
+        f"生成文章取り込み: saved={len(created)}, converted={converted_count}, "
+        f"duplicates={len(candidates) - len(created)}, skipped={skipped_count}"
+    )
+    return [{"text": text_pair.kanji, "id": text_pair.id} for text_pair in created]
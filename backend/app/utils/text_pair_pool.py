@@ -0,0 +1,160 @@
+import logging
+import random
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger("app")
+
+
+class TextPairPool:
+    """変換済みTextPairを事前にシャッフルして保持する配信プール（ワーカー単位）
+
+    - 補充時はランダムな開始IDから主キー順に (id, kanji, hiragana) を読み込み、
+      全件を並べ替える ORDER BY RANDOM() を避ける
+    - 各リクエストはバッファから取り出すだけで、通常はDBへの問い合わせは発生しない
+    - 残数が refill_threshold を下回ると裏で補充し、
+      バッファが1回分に満たない場合のみ同期で補充する
+    - テーブル全件がバッファに収まる場合はDBを読み直さず、保持分を再シャッフルする
+    - max_size 件 / max_bytes バイトを上限とし、ワーカーのメモリ使用量を抑える
+    - max_age 秒を超えたバッファは新規文章やパーティション削除を反映するため入れ替える
+    """
+
+    def __init__(
+        self, max_size: int, max_bytes: int, refill_threshold: int, max_age: float
+    ):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.refill_threshold = refill_threshold
+        self.max_age = max_age
+        self._buffer: list[tuple[int, str, str]] = []
+        # 直近に読み込んだ全件と、それがテーブル全件かどうか
+        self._loaded: list[tuple[int, str, str]] = []
+        self._is_complete = False
+        self._filled_at = 0.0
+        self._lock = threading.Lock()
+        self._refilling = False
+
+    def draw(self, count: int) -> list[tuple[int, str, str]]:
+        """プールから count 件を取り出す（重複なし）
+
+        変換済みの文章が count 件未満の場合は全件を返す。
+        """
+        if count <= 0:
+            return []
+        with self._lock:
+            if len(self._buffer) < count:
+                if self._is_complete and len(self._loaded) >= count:
+                    self._reshuffle_locked()
+                else:
+                    # 初回、または裏の補充が間に合わない場合は同期で補充する
+                    self._refill_locked()
+            drawn = self._buffer[-count:]
+            del self._buffer[-count:]
+            is_stale = time.monotonic() - self._filled_at > self.max_age
+            # 全件保持中は再シャッフルで足りるため、裏で読み直さない
+            is_low = not self._is_complete and len(self._buffer) < self._threshold()
+
+        if is_stale or is_low:
+            self._refill_in_background()
+        return drawn
+
+    def size(self) -> int:
+        return len(self._buffer)
+
+    def _threshold(self) -> int:
+        # 小さなテーブルで毎回補充が走らないよう、読み込み件数の半分を上限とする
+        return min(self.refill_threshold, len(self._loaded) // 2)
+
+    def _load(self) -> tuple[list[tuple[int, str, str]], bool]:
+        """ランダムな変換済みペアと、それがテーブル全件かどうかを返す
+
+        ランダムな開始IDから主キー順に max_size 件を読み、末尾に達した場合は
+        先頭から続きを読む。どちらも主キーの範囲検索で済む。
+        """
+        from django.db.models import Max, Min
+
+        from app.models.game import TextPair
+
+        converted = TextPair.objects.filter(is_converted=True)
+        id_range = converted.aggregate(low=Min("id"), high=Max("id"))
+        if id_range["low"] is None:
+            return [], True
+
+        start = random.randint(id_range["low"], id_range["high"])
+        fields = ("id", "kanji", "hiragana")
+        rows = list(
+            converted.filter(id__gte=start)
+            .order_by("id")
+            .values_list(*fields)[: self.max_size]
+        )
+        if len(rows) < self.max_size:
+            rows += (
+                converted.filter(id__lt=start)
+                .order_by("id")
+                .values_list(*fields)[: self.max_size - len(rows)]
+            )
+
+        pairs = []
+        total_bytes = 0
+        is_complete = True
+        for row in rows:
+            total_bytes += sys.getsizeof(row[1]) + sys.getsizeof(row[2] or "")
+            if total_bytes > self.max_bytes:
+                is_complete = False
+                break
+            pairs.append(row)
+        if len(pairs) >= self.max_size:
+            is_complete = False
+        # 読み込みは主キー順のため、プロセス内でシャッフルする
+        random.shuffle(pairs)
+        return pairs, is_complete
+
+    def _store_locked(
+        self, pairs: list[tuple[int, str, str]], is_complete: bool
+    ) -> None:
+        self._loaded = pairs
+        self._is_complete = is_complete
+        self._buffer = list(pairs)
+        self._filled_at = time.monotonic()
+
+    def _refill_locked(self) -> None:
+        self._store_locked(*self._load())
+        logger.info(f"TextPairプール補充: size={len(self._buffer)}")
+
+    def _reshuffle_locked(self) -> None:
+        self._buffer = random.sample(self._loaded, len(self._loaded))
+
+    def _refill_in_background(self) -> None:
+        with self._lock:
+            if self._refilling:
+                return
+            self._refilling = True
+
+        def run():
+            try:
+                pairs, is_complete = self._load()
+                with self._lock:
+                    self._store_locked(pairs, is_complete)
+                logger.info(
+                    f"TextPairプール補充（バックグラウンド）: size={len(pairs)}"
+                )
+            except Exception as e:
+                logger.warning(f"TextPairプール補充エラー: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refilling = False
+                close_old_connections()
+
+        threading.Thread(target=run, name="text-pair-pool-refill", daemon=True).start()
+
+
+text_pair_pool = TextPairPool(
+    max_size=getattr(settings, "TEXT_PAIR_POOL_MAX_SIZE", 3000),
+    max_bytes=getattr(settings, "TEXT_PAIR_POOL_MAX_BYTES", 8 * 1024 * 1024),
+    refill_threshold=getattr(settings, "TEXT_PAIR_POOL_REFILL_THRESHOLD", 300),
+    max_age=getattr(settings, "TEXT_PAIR_POOL_MAX_AGE_SECONDS", 600),
+)
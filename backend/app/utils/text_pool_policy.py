@@ -0,0 +1,106 @@
+import logging
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger("app")
+
+
+def get_pool_depth() -> tuple[int, int]:
+    """配信可能な文章数と変換待ちの文章数を返す
+
+    直近に変換に失敗した（再試行待ちの）文章は変換待ちに含めない。
+
+    Returns:
+        tuple[int, int]: (変換済み件数, 変換待ち件数)
+    """
+    from django.db.models import Count, Q
+
+    from app.models.game import TextPair
+
+    counts = TextPair.objects.aggregate(
+        converted=Count("id", filter=Q(is_converted=True)),
+        unconverted=Count("id", filter=TextPair.pending_conversion()),
+    )
+    return counts["converted"], counts["unconverted"]
+
+
+class PoolDecision:
+    def __init__(self, generate: bool, urgent: bool, convert: bool, reason: str):
+        self.generate = generate
+        self.urgent = urgent
+        self.convert = convert
+        self.reason = reason
+
+
+class TextPoolPolicy:
+    """文章プールの残量に応じて生成・変換ジョブを起動するかを判断する
+
+    - 変換済み＋未変換の合計が low_water 未満: 短い間隔で生成（並列生成）
+    - low_water 以上 high_water 未満: 通常の間隔で生成
+    - high_water 以上: 生成しない（APIの利用枠を消費しない）
+    - 変換済みが high_water 未満で、変換待ちが conversion_threshold 件以上、
+      または変換待ちがあり前回の変換から generation_interval 秒以上経過: 変換ジョブを起動
+    """
+
+    def __init__(
+        self,
+        low_water: int,
+        high_water: int,
+        generation_interval: float,
+        urgent_generation_interval: float,
+        conversion_threshold: int,
+    ):
+        self.low_water = low_water
+        self.high_water = high_water
+        self.generation_interval = generation_interval
+        self.urgent_generation_interval = urgent_generation_interval
+        self.conversion_threshold = conversion_threshold
+        self._last_generation = None
+        self._last_conversion = None
+
+    def decide(self, converted: int, unconverted: int, now=None) -> PoolDecision:
+        now = time.monotonic() if now is None else now
+        total = converted + unconverted
+        since_generation = self._since(self._last_generation, now)
+
+        # 少数の変換待ちは閾値に達するまで溜め、一定間隔ごとにまとめて変換する
+        convert = converted < self.high_water and (
+            unconverted >= self.conversion_threshold
+            or (
+                unconverted > 0
+                and self._since(self._last_conversion, now) >= self.generation_interval
+            )
+        )
+        if convert:
+            self._last_conversion = now
+
+        if total >= self.high_water:
+            return PoolDecision(False, False, convert, "high_water")
+
+        urgent = total < self.low_water
+        interval = (
+            self.urgent_generation_interval if urgent else self.generation_interval
+        )
+        generate = since_generation >= interval
+        if generate:
+            self._last_generation = now
+        return PoolDecision(
+            generate, urgent, convert, "low_water" if urgent else "normal"
+        )
+
+    @staticmethod
+    def _since(last, now) -> float:
+        return float("inf") if last is None else now - last
+
+    @classmethod
+    def from_settings(cls) -> "TextPoolPolicy":
+        return cls(
+            low_water=settings.TEXT_POOL_LOW_WATER_MARK,
+            high_water=settings.TEXT_POOL_HIGH_WATER_MARK,
+            generation_interval=settings.TEXT_POOL_GENERATION_INTERVAL_SECONDS,
+            urgent_generation_interval=(
+                settings.TEXT_POOL_URGENT_GENERATION_INTERVAL_SECONDS
+            ),
+            conversion_threshold=settings.TEXT_POOL_CONVERSION_THRESHOLD,
+        )
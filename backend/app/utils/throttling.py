@@ -1,13 +1,21 @@
 import logging
+import threading
+import time
 from functools import wraps
 from typing import Callable
 
 from django.conf import settings
-from django.core.cache import cache
+from django.core.cache import caches
 from django.http import HttpRequest
+from django.utils.connection import ConnectionProxy
+
+from app.utils import metrics
 
 logger = logging.getLogger("app")
 
+# 制限を全ワーカーで共有するため、カウンターは shared キャッシュに置く
+cache = ConnectionProxy(caches, settings.SHARED_CACHE_ALIAS)
+
 
 class ThrottlingError(Exception):
     """レート制限に達した場合の例外"""
@@ -15,95 +23,252 @@ class ThrottlingError(Exception):
     pass
 
 
-class ThrottlingManager:
-    """レート制限を管理するクラス"""
+class RateLimit:
+    """'10/m' 形式のレート制限を解析した結果（デコレート時に1度だけ解析する）"""
 
-    @staticmethod
-    def get_cache_key(identifier: str, action: str) -> str:
-        """キャッシュキーを生成する"""
-        prefix = getattr(settings, "RATELIMIT_KEY_PREFIX", "rl")
-        return f"{prefix}:{identifier}:{action}"
+    PERIOD_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
 
-    @staticmethod
-    def is_rate_limited(identifier: str, action: str, limit: str) -> bool:
+    def __init__(self, count: int, window: int, spec: str):
+        self.count = count
+        self.window = window
+        self.spec = spec
+
+    @classmethod
+    def parse(cls, limit: str) -> "RateLimit":
         """
-        レート制限に達しているかチェックする
+        制限を解析する
 
         Args:
-            identifier: 識別子（IPアドレス、ユーザーID等）
-            action: アクション名
             limit: 制限（例: '10/m', '100/h'）
 
-        Returns:
-            bool: 制限に達している場合はTrue
+        Raises:
+            ValueError: 形式または期間指定が不正な場合
         """
-        try:
-            # 制限の解析
-            count, period = limit.split("/")
-            count = int(count)
-
-            # 期間を秒に変換
-            if period == "s":
-                window = count
-            elif period == "m":
-                window = count * 60
-            elif period == "h":
-                window = count * 3600
-            elif period == "d":
-                window = count * 86400
-            else:
-                logger.warning(f"不明な期間指定: {period}")
-                return False
+        count, period = limit.split("/")
+        if period not in cls.PERIOD_SECONDS:
+            raise ValueError(f"不明な期間指定: {period}")
+        return cls(int(count), cls.PERIOD_SECONDS[period], limit)
+
+    def __str__(self):
+        return self.spec
+
+
+class LocalThrottleTier:
+    """shared キャッシュの前段に置くワーカー単位のカウンター
+
+    - shared キャッシュ（DB / Redis / Memcached）への往復をまとめるための層で、
+      メモリ上の値はワーカー内にのみ保持し、同期先は常に shared キャッシュとする
+    - 各ワーカーは最後に同期した共有カウンターの値と未同期の件数を保持し、
+      通常のチェックはメモリ内だけで判定する
+    - 未同期が sync_batch 件に達した、前回同期から sync_interval 秒経過した、
+      または推定値が制限の near_limit_ratio 倍に達した場合に、
+      未同期分をまとめて shared キャッシュの cache.incr で反映して判定する
+    - sync_batch=1 にすると毎回同期する（正確さ優先）。大きくするほど
+      キャッシュへの問い合わせは減るが、ワーカー数×(sync_batch-1) 件まで
+      制限を超えうる
+    """
 
-            cache_key = ThrottlingManager.get_cache_key(identifier, action)
-            current_count = cache.get(cache_key, 0)
+    MAX_ENTRIES = 10000
 
-            if current_count >= count:
-                logger.warning(
-                    f"レート制限に達しました: {identifier}:{action} ({current_count}/{count})"
-                )
-                return True
+    def __init__(self, sync_batch: int, sync_interval: float, near_limit_ratio: float):
+        self.sync_batch = sync_batch
+        self.sync_interval = sync_interval
+        self.near_limit_ratio = near_limit_ratio
+        # ウィンドウのキー → [共有カウンターの値, 未同期の件数, 最終同期時刻]
+        self._entries: dict[str, list] = {}
+        self._lock = threading.Lock()
 
-            return False
+    def hit(self, key: str, rate: "RateLimit", previous: float, now: float) -> bool:
+        """1件を記録し、制限内であれば True を返す
 
-        except Exception as e:
-            logger.error(f"レート制限チェックエラー: {e}")
+        Args:
+            key: 現在のウィンドウのキャッシュキー
+            rate: 解析済みの制限
+            previous: 直前のウィンドウの件数（按分済み）
+            now: 現在時刻
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.MAX_ENTRIES:
+                    self._flush_all_locked()
+                entry = [0, 0, 0.0]
+                self._entries[key] = entry
+            entry[1] += 1
+            estimated = entry[0] + entry[1] + previous
+            needs_sync = (
+                entry[1] >= self.sync_batch
+                or now - entry[2] >= self.sync_interval
+                or estimated >= rate.count * self.near_limit_ratio
+            )
+            if not needs_sync:
+                if estimated > rate.count:
+                    entry[1] -= 1
+                    return False
+                return True
+            delta = entry[1]
+            entry[1] = 0
+
+        shared_count = ThrottlingManager._increment(key, rate.window, delta)
+        with self._lock:
+            entry[0] = shared_count
+            entry[2] = now
+
+        if shared_count + previous > rate.count:
+            # 拒否したリクエストの分だけ取り消す
+            try:
+                cache.decr(key)
+            except ValueError:
+                # 共有カウンターが期限切れの場合は取り消す必要がない
+                pass
+            with self._lock:
+                entry[0] = shared_count - 1
             return False
+        return True
+
+    def flush(self, key: str) -> None:
+        """未同期の件数を共有カウンターへ反映する（ウィンドウ終了後の参照前に呼ぶ）"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None and entry[1] > 0:
+            try:
+                cache.incr(key, entry[1])
+            except ValueError:
+                # 共有カウンターが期限切れの場合は反映しない
+                pass
+
+    def _flush_all_locked(self) -> None:
+        for key, entry in self._entries.items():
+            if entry[1] > 0:
+                try:
+                    cache.incr(key, entry[1])
+                except ValueError:
+                    pass
+        self._entries.clear()
+
+
+class ThrottlingManager:
+    """レート制限を管理するクラス
+
+    スライディングウィンドウカウンター方式:
+    - 固定ウィンドウごとのカウンターを shared キャッシュの cache.incr で加算する
+      （Redis / Memcached では原子的。全ワーカーで同じカウンターを参照する）
+    - 直前のウィンドウの件数を経過割合で按分して加え、境界での集中を防ぐ
+    - 直前のウィンドウの件数は確定済みのため、プロセス内で記憶して再取得しない
+      （通常は1回のチェックにつきキャッシュへの問い合わせは incr の1回のみ）
+    - ローカル層（LocalThrottleTier）が有効な場合、incr はまとめて行う
+    """
+
+    # 直前のウィンドウの件数（キー → 件数）
+    _previous_counts: dict[str, int] = {}
+    _previous_counts_lock = threading.Lock()
+    MAX_PREVIOUS_COUNTS = 10000
+
+    # ワーカー単位のカウンター（THROTTLE_LOCAL_TIER_ENABLED が有効な場合のみ）
+    _local_tier: LocalThrottleTier | None = None
+    _local_tier_initialized = False
 
     @staticmethod
-    def increment_counter(identifier: str, action: str, limit: str) -> None:
+    def get_cache_key(identifier: str, action: str) -> str:
+        """キャッシュキーを生成する"""
+        prefix = getattr(settings, "RATELIMIT_KEY_PREFIX", "rl")
+        return f"{prefix}:{identifier}:{action}"
+
+    @staticmethod
+    def _increment(key: str, window: int, delta: int = 1) -> int:
+        """ウィンドウのカウンターを原子的に加算し、加算後の値を返す"""
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            # キーが存在しない（ウィンドウの最初のリクエスト）
+            # 直前のウィンドウとして参照されるよう、2ウィンドウ分保持する
+            if cache.add(key, delta, window * 2):
+                return delta
+            # 同時に作成された場合は加算し直す
+            return cache.incr(key, delta)
+
+    @classmethod
+    def get_local_tier(cls) -> LocalThrottleTier | None:
+        if not cls._local_tier_initialized:
+            if getattr(settings, "THROTTLE_LOCAL_TIER_ENABLED", True):
+                cls._local_tier = LocalThrottleTier(
+                    sync_batch=getattr(settings, "THROTTLE_LOCAL_SYNC_BATCH", 4),
+                    sync_interval=getattr(
+                        settings, "THROTTLE_LOCAL_SYNC_INTERVAL_SECONDS", 1.0
+                    ),
+                    near_limit_ratio=getattr(
+                        settings, "THROTTLE_LOCAL_NEAR_LIMIT_RATIO", 0.5
+                    ),
+                )
+            cls._local_tier_initialized = True
+        return cls._local_tier
+
+    @classmethod
+    def _previous_count(cls, key: str) -> int:
+        count = cls._previous_counts.get(key)
+        if count is None:
+            local_tier = cls.get_local_tier()
+            if local_tier is not None:
+                local_tier.flush(key)
+            count = cache.get(key, 0)
+            with cls._previous_counts_lock:
+                if len(cls._previous_counts) >= cls.MAX_PREVIOUS_COUNTS:
+                    cls._previous_counts.clear()
+                cls._previous_counts[key] = count
+        return count
+
+    @classmethod
+    def hit(cls, identifier: str, action: str, rate: RateLimit) -> bool:
         """
-        カウンターをインクリメントする
+        リクエストを1件記録し、制限内であれば True を返す
+
+        制限を超えた場合は加算を取り消すため、拒否されたリクエストは件数に含まれない。
 
         Args:
-            identifier: 識別子
+            identifier: 識別子（IPアドレス、ユーザーID等）
             action: アクション名
-            limit: 制限
+            rate: 解析済みの制限
+
+        Returns:
+            bool: 制限内の場合はTrue
         """
         try:
-            count, period = limit.split("/")
-            count = int(count)
-
-            # 期間を秒に変換
-            if period == "s":
-                window = count
-            elif period == "m":
-                window = count * 60
-            elif period == "h":
-                window = count * 3600
-            elif period == "d":
-                window = count * 86400
-            else:
-                return
-
-            cache_key = ThrottlingManager.get_cache_key(identifier, action)
-            current_count = cache.get(cache_key, 0)
-
-            # カウンターをインクリメントし、期間後に期限切れにする
-            cache.set(cache_key, current_count + 1, window)
+            now = time.time()
+            window_index, elapsed = divmod(now, rate.window)
+            base_key = cls.get_cache_key(identifier, action)
+            current_key = f"{base_key}:{int(window_index)}"
+            previous_key = f"{base_key}:{int(window_index) - 1}"
+
+            previous_weight = 1 - elapsed / rate.window
+            previous = cls._previous_count(previous_key) * previous_weight
+
+            local_tier = cls.get_local_tier()
+            if local_tier is not None:
+                allowed = local_tier.hit(current_key, rate, previous, now)
+                if not allowed:
+                    logger.warning(f"レート制限に達しました: {identifier}:{action}")
+                    metrics.record_throttle_rejection(action)
+                return allowed
+
+            estimated = cls._increment(current_key, rate.window) + previous
+
+            if estimated > rate.count:
+                # 拒否したリクエストの分だけ取り消す（期限切れでも拒否は維持する）
+                try:
+                    cache.decr(current_key)
+                except ValueError:
+                    pass
+                logger.warning(
+                    f"レート制限に達しました: {identifier}:{action} "
+                    f"({estimated:.1f}/{rate.count})"
+                )
+                metrics.record_throttle_rejection(action)
+                return False
+            return True
 
         except Exception as e:
-            logger.error(f"カウンターインクリメントエラー: {e}")
+            logger.error(f"レート制限チェックエラー: {e}")
+            return True
 
 
 def throttle(limit: str, key_func: Callable = None):
@@ -124,6 +289,9 @@ def throttle(limit: str, key_func: Callable = None):
             pass
     """
 
+    # 制限はデコレート時に1度だけ解析する
+    rate = RateLimit.parse(limit)
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -144,14 +312,11 @@ def throttle(limit: str, key_func: Callable = None):
             else:
                 identifier = request.META.get("REMOTE_ADDR", "unknown")
 
-            # レート制限チェック
-            if ThrottlingManager.is_rate_limited(identifier, func.__name__, limit):
+            # レート制限チェック（チェックとカウンターの加算を同時に行う）
+            if not ThrottlingManager.hit(identifier, func.__name__, rate):
                 logger.warning(f"レート制限に達しました: {identifier}:{func.__name__}")
                 raise ThrottlingError(f"レート制限に達しました: {limit}")
 
-            # カウンターをインクリメント
-            ThrottlingManager.increment_counter(identifier, func.__name__, limit)
-
             # 元の関数を実行
             return func(*args, **kwargs)
 
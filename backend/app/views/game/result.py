@@ -1,11 +1,11 @@
 import logging
 
 import graphene
-from django.db.models import Count, Sum
 from graphene_django.types import DjangoObjectType
 
-from app.models import Game, User
+from app.models import Game, RankingIndexNode, User
 from app.utils.constants import ResultErrorMessages
+from app.utils.dataloaders import load_related
 from app.utils.errors import BaseError
 
 logger = logging.getLogger("app")
@@ -33,6 +33,9 @@ class GameType(DjangoObjectType):
         model = Game
         fields = ("id", "user", "bet_gold", "score", "score_gold_change", "created_at")
 
+    def resolve_user(self, info):
+        return load_related(self, "user", info)
+
 
 class GameResultType(graphene.ObjectType):
     """ゲーム結果のGraphQL型定義"""
@@ -70,12 +73,9 @@ class GameResult:
             result_gold = self.game.result_gold
             logger.info(f"最終所持金: {result_gold}")
 
-            # 現在のランキング
-            current_rank = self._get_current_rank()
+            # 現在のランキングと変動（Fenwick木から1クエリで算出）
+            current_rank, rank_change = self._get_current_rank_and_change()
             logger.info(f"現在のランキング: {current_rank}")
-
-            # ランキングの変動
-            rank_change = self._get_rank_change()
             logger.info(f"ランキング変動: {rank_change}")
 
             # 次のランキングまでの必要金額
@@ -103,75 +103,48 @@ class GameResult:
                 details=[str(e)],
             )
 
-    def _get_current_rank(self) -> int:
-        logger.info(f"現在のランキング取得開始: user_id={self.user.id}")
-        try:
-            rank = (
-                User.objects.filter(gold__gt=self.user.gold)
-                .values("gold")
-                .annotate(count=Count("id"))
-                .aggregate(total=Sum("count"))["total"]
-                or 0
-            )
-            current_rank = rank + 1
-            logger.info(
-                f"現在のランキング取得完了: user_id={self.user.id}, rank={current_rank}"
-            )
-            return current_rank
-        except Exception as e:
-            logger.error(
-                f"ランキング取得エラー: user_id={self.user.id}, error={str(e)}",
-                exc_info=True,
-            )
-            raise ResultError(
-                message=ResultErrorMessages.RANKING_CALCULATION_ERROR,
-                details=[str(e)],
-            )
-
-    def _get_rank_change(self) -> int:
-        logger.info(f"ランキング変動取得開始: user_id={self.user.id}")
+    def _get_current_rank_and_change(self) -> tuple[int, int]:
+        logger.info(f"ランキング取得開始: user_id={self.user.id}")
         try:
             # 前回の所持金
             previous_gold = self.user.gold - self.game.score_gold_change
             logger.info(f"前回の所持金: {previous_gold}")
 
-            # 前回のランキングを取得
-            previous_rank = (
-                User.objects.filter(gold__gt=previous_gold)
-                .values("gold")
-                .annotate(count=Count("id"))
-                .aggregate(total=Sum("count"))["total"]
-                or 0
+            # 現在・前回のランキングを1回のクエリで取得
+            current_rank, previous_rank = RankingIndexNode.ranks_of(
+                [self.user.gold, previous_gold]
             )
-            previous_rank += 1
             logger.info(f"前回のランキング: {previous_rank}")
 
-            # 現在のランキング
-            current_rank = self._get_current_rank()
-            logger.info(f"現在のランキング: {current_rank}")
-
             # ランキングの変動を計算
             rank_change = previous_rank - current_rank
-            logger.info(f"ランキング変動計算完了: {rank_change}")
-            return rank_change
+            logger.info(
+                f"ランキング取得完了: user_id={self.user.id}, "
+                f"rank={current_rank}, rank_change={rank_change}"
+            )
+            return current_rank, rank_change
         except Exception as e:
             logger.error(
-                f"ランキング変動取得エラー: user_id={self.user.id}, error={str(e)}",
+                f"ランキング取得エラー: user_id={self.user.id}, error={str(e)}",
                 exc_info=True,
             )
             raise ResultError(
-                message=ResultErrorMessages.RANK_CHANGE_CALCULATION_ERROR,
+                message=ResultErrorMessages.RANKING_CALCULATION_ERROR,
                 details=[str(e)],
             )
 
     def _get_next_rank_gold(self) -> int | None:
         logger.info(f"次のランク必要金額取得開始: user_id={self.user.id}")
         try:
-            next_rank_user = (
-                User.objects.filter(gold__gt=self.user.gold).order_by("gold").first()
+            # idx_user_gold を使い、1つ上のゴールドのみを取得
+            next_gold = (
+                User.objects.filter(is_active=True, gold__gt=self.user.gold)
+                .order_by("gold")
+                .values_list("gold", flat=True)
+                .first()
             )
-            if next_rank_user:
-                next_rank_gold = next_rank_user.gold - self.user.gold
+            if next_gold is not None:
+                next_rank_gold = next_gold - self.user.gold
                 logger.info(f"次のランク必要金額: {next_rank_gold}")
                 return next_rank_gold
             return 0
@@ -5,11 +5,11 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 from graphene import Boolean, Int, List, Mutation, String
 
-from app.models import Game
 from app.utils.game_calculator import GameCalculator
 from app.utils.sanitizer import sanitize_string
 from app.utils.validators import GameValidator
 from app.utils.graphql_throttling import graphql_throttle, get_user_identifier
+from app.utils.score_snapshot import score_snapshot
 
 logger = logging.getLogger("app")
 
@@ -28,7 +28,7 @@ class CompletePractice(Mutation):
 
     @classmethod
     @transaction.atomic
-    @graphql_throttle('30/m', get_user_identifier)
+    @graphql_throttle("30/m", get_user_identifier)
     def mutate(cls, root, info, correct_typed, accuracy):
         try:
             # 文字列で来た場合のサニタイジングと安全変換
@@ -55,10 +55,12 @@ class CompletePractice(Mutation):
             score = GameCalculator.calculate_score(correct_typed, accuracy)
             logger.info(f"スコア計算: score={score}")
 
-            # 過去のスコアを取得してZスコアを計算
-            past_scores = list(Game.objects.values_list("score", flat=True))
-            if past_scores:
-                z_score = GameCalculator.calculate_z_score(score, past_scores)
+            # プロセス内のスコア分布スナップショットからZスコアを計算
+            distribution = score_snapshot.get()
+            if distribution.count:
+                z_score = GameCalculator.calculate_z_score_from_distribution(
+                    score, distribution
+                )
                 logger.info(f"Zスコア計算: z_score={z_score}")
 
                 # 倍率の計算
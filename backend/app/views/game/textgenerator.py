@@ -1,19 +1,25 @@
+import asyncio
 import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import google.generativeai as genai
 import graphene
 import yaml
 from django.conf import settings
-from django.db import transaction
 
-from app.models.game import TextPair
 from app.utils.constants import TextGeneratorErrorMessages
 from app.utils.errors import BaseError
 from app.utils.graphql_throttling import get_user_identifier, graphql_throttle
+from app.utils.stub_text_model import StubGenerativeModel
+from app.utils.text_ingestion import ingest_sentences
 
 logger = logging.getLogger("app")
 
+# GEMINI_MODEL にこの値を指定するとオフラインのスタブモデルを使用する
+STUB_MODEL_NAME = "stub"
+
 
 class TextGeneratorError(BaseError):
     """テキスト生成に関するエラーを表す例外クラス"""
@@ -33,12 +39,19 @@ class TextGeneratorError(BaseError):
 
 
 class TextGenerator:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, model=None):
         logger.info("TextGenerator初期化開始")
         try:
-            api_key = api_key or settings.GEMINI_API_KEY
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+            if model is not None:
+                # generate_content を実装したモデル（スタブ等）を直接使用
+                self.model = model
+            elif settings.GEMINI_MODEL == STUB_MODEL_NAME:
+                logger.info("スタブモデルを使用します")
+                self.model = StubGenerativeModel()
+            else:
+                api_key = api_key or settings.GEMINI_API_KEY
+                genai.configure(api_key=api_key)
+                self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
 
             # 設定ファイルの読み込み
             base_path = Path(__file__).parent.parent.parent / "text_generation"
@@ -73,7 +86,145 @@ class TextGenerator:
                 details=[str(e)],
             )
 
-    def generate_text(self):
+    def _build_prompts(self, prompt_count: int) -> list[str]:
+        """typing_prompt にテーマを付け加えたプロンプトを prompt_count 個作成する"""
+        prompt = self.prompts["typing_prompt"]
+        themes = list(self.prompts.get("typing_prompt_themes") or [])
+        if not themes:
+            return [prompt] * prompt_count
+        random.shuffle(themes)
+        return [
+            f"{prompt}\n■ テーマ\n{themes[i % len(themes)]}に関する文章にしてください。\n"
+            for i in range(prompt_count)
+        ]
+
+    async def _call_ai_with_retry(
+        self, prompt, semaphore, executor, timeout, max_retries, backoff
+    ):
+        """同時実行数・タイムアウト・リトライ付きでAIを呼び出す
+
+        generate_content は同期APIのため、スレッドで実行して並列化する。
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(max_retries + 1):
+            try:
+                async with semaphore:
+                    response = await asyncio.wait_for(
+                        loop.run_in_executor(
+                            executor, self.model.generate_content, prompt
+                        ),
+                        timeout=timeout,
+                    )
+                return response.text
+            except genai.types.BlockedPromptException as e:
+                # ブロックされたプロンプトは再試行しても結果が変わらない
+                logger.warning(f"AIテキスト生成でブロックされました: {e}")
+                raise TextGeneratorError(
+                    message=TextGeneratorErrorMessages.TEXT_GENERATION_ERROR,
+                    details=[str(e)],
+                )
+            except Exception as e:
+                error = (
+                    "タイムアウト" if isinstance(e, asyncio.TimeoutError) else str(e)
+                )
+                if attempt >= max_retries:
+                    logger.warning(f"AIテキスト生成でエラーが発生しました: {error}")
+                    raise TextGeneratorError(
+                        message=TextGeneratorErrorMessages.TEXT_GENERATION_ERROR,
+                        details=[error],
+                    )
+                # 指数バックオフ（同時に再試行しないようジッターを加える）
+                delay = backoff * (2**attempt) * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"AIテキスト生成リトライ: attempt={attempt + 1}, "
+                    f"delay={delay:.1f}秒, error={error}"
+                )
+                await asyncio.sleep(delay)
+
+    async def _generate_all(self, prompts, concurrency, timeout, max_retries, backoff):
+        semaphore = asyncio.Semaphore(concurrency)
+        # タイムアウトした呼び出しのスレッドは止められないため、
+        # 専用のスレッドプールを使い、終了時に待たずに切り離す
+        executor = ThreadPoolExecutor(
+            max_workers=len(prompts) * (max_retries + 1),
+            thread_name_prefix="text-generation",
+        )
+        try:
+            return await asyncio.gather(
+                *(
+                    self._call_ai_with_retry(
+                        prompt, semaphore, executor, timeout, max_retries, backoff
+                    )
+                    for prompt in prompts
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def generate_text_concurrently(
+        self, prompt_count=None, concurrency=None, convert=None
+    ):
+        """複数のプロンプトを並列でAIに送り、結果をまとめて1回で取り込む
+
+        一部のプロンプトが失敗しても、成功した分の文章は保存する。
+        convert を渡した場合は変換済みの状態で保存する（ingest_sentences を参照）。
+        """
+        prompt_count = prompt_count or settings.TEXT_GENERATION_PROMPT_COUNT
+        concurrency = concurrency or settings.TEXT_GENERATION_CONCURRENCY
+        logger.info(
+            f"並列テキスト生成開始: prompts={prompt_count}, concurrency={concurrency}"
+        )
+        try:
+            prompts = self._build_prompts(prompt_count)
+            results = asyncio.run(
+                self._generate_all(
+                    prompts,
+                    concurrency,
+                    settings.TEXT_GENERATION_TIMEOUT_SECONDS,
+                    settings.TEXT_GENERATION_MAX_RETRIES,
+                    settings.TEXT_GENERATION_RETRY_BACKOFF_SECONDS,
+                )
+            )
+
+            lines = []
+            failed_prompts = 0
+            for result in results:
+                if isinstance(result, BaseException):
+                    failed_prompts += 1
+                    continue
+                lines.extend(result.strip().split("\n"))
+
+            if failed_prompts == len(prompts):
+                raise TextGeneratorError(
+                    message=TextGeneratorErrorMessages.AI_REQUEST_ERROR,
+                    details=[str(result) for result in results],
+                )
+
+            saved_sentences = ingest_sentences(lines, convert=convert)
+            logger.info(
+                f"並列テキスト生成完了: sentences_count={len(saved_sentences)}, "
+                f"failed_prompts={failed_prompts}"
+            )
+            return {
+                "sentences": saved_sentences,
+                "failed_prompts": failed_prompts,
+            }
+
+        except TextGeneratorError:
+            raise
+        except Exception as e:
+            logger.error(f"並列テキスト生成エラー: {str(e)}", exc_info=True)
+            raise TextGeneratorError(
+                message=TextGeneratorErrorMessages.TEXT_GENERATION_ERROR,
+                details=[str(e)],
+            )
+
+    def generate_text(self, convert=None):
+        """AIで文章を生成して保存する
+
+        convert を渡した場合は変換済みの状態で保存する（ingest_sentences を参照）。
+        """
         logger.info("テキスト生成開始")
         try:
             # プロンプトを取得
@@ -85,26 +236,11 @@ class TextGenerator:
             generated_text = self._call_ai_for_text_generation(prompt)
             logger.info("AIレスポンス受信")
 
-            # 生成されたテキストを整形
+            # 生成されたテキストを正規化・重複除去し、1回の bulk_create で保存
             try:
-                sentences = [
-                    sentence.strip()
-                    for sentence in generated_text.strip().split("\n")
-                    if sentence.strip()
-                ]  # 空行を削除し、各行をトリム
-
-                # 各文章をTextPairテーブルに保存
-                saved_sentences = []
-                with transaction.atomic():
-                    for i, sentence in enumerate(sentences):
-                        if sentence:
-                            # TextPairテーブルに保存
-                            text_pair = TextPair.objects.create(
-                                kanji=sentence, is_converted=False
-                            )
-                            saved_sentences.append(
-                                {"text": sentence, "id": text_pair.id}
-                            )
+                saved_sentences = ingest_sentences(
+                    generated_text.strip().split("\n"), convert=convert
+                )
 
                 logger.info(f"テキスト生成完了: sentences_count={len(saved_sentences)}")
                 result = {
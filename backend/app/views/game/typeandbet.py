@@ -6,10 +6,13 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 from graphene_django.types import DjangoObjectType
 
-from app.models import Game, Ranking
+from app.models import Game, ScoreStatistics, User
+from app.utils import metrics
 from app.utils.constants import GameErrorMessages
+from app.utils.dataloaders import load_related
 from app.utils.game_calculator import GameCalculator
 from app.utils.graphql_throttling import get_game_action_identifier, graphql_throttle
+from app.utils.ranking_tasks import schedule_rankings_recompute
 from app.utils.sanitizer import sanitize_string
 from app.utils.validators import GameValidator
 
@@ -21,6 +24,9 @@ class GameType(DjangoObjectType):
         model = Game
         fields = ("id", "user", "bet_gold", "score", "score_gold_change", "created_at")
 
+    def resolve_user(self, info):
+        return load_related(self, "user", info)
+
 
 class CreateBet(graphene.Mutation):
     """新しいベット（ゲーム）を作成するミューテーション"""
@@ -53,6 +59,8 @@ class CreateBet(graphene.Mutation):
             if not user.is_authenticated:
                 logger.warning("未認証ユーザーのアクセス")
                 raise ValidationError(GameErrorMessages.LOGIN_REQUIRED)
+            # 所持金は行ロック付きで取得し直す（同時リクエストでの上書きを防ぐ）
+            user = User.objects.select_for_update().get(pk=user.pk)
             logger.info(f"ユーザー情報取得: user_id={user.id}")
             logger.info(f"現在の所持金: {user.gold}")
 
@@ -75,6 +83,13 @@ class CreateBet(graphene.Mutation):
             user.save()
             logger.info(f"所持金更新: new_gold={user.gold}")
 
+            # コミットされた場合のみメトリクスに記録
+            transaction.on_commit(lambda: metrics.record_bet_created(bet_gold))
+
+            # ランキングの一括再計算を予約（コミット後にデバウンスして実行）
+            transaction.on_commit(schedule_rankings_recompute)
+            logger.info("ランキング一括更新を予約")
+
             # 出力は必要最小限のみ返却
             return CreateBet(
                 game=CreateBet.CreateBetGameType(
@@ -135,6 +150,8 @@ class UpdateGameScore(graphene.Mutation):
             if not user.is_authenticated:
                 logger.warning("未認証ユーザーのアクセス")
                 raise ValidationError(GameErrorMessages.LOGIN_REQUIRED)
+            # 所持金は行ロック付きで取得し直す（同時リクエストでの上書きを防ぐ）
+            user = User.objects.select_for_update().get(pk=user.pk)
             logger.info(f"ユーザー情報取得: user_id={user.id}")
 
             # バリデーション
@@ -186,14 +203,12 @@ class UpdateGameScore(graphene.Mutation):
             score = GameCalculator.calculate_score(correct_typed, accuracy)
             logger.info(f"スコア計算: score={score}")
 
-            # 過去のスコアを取得してZスコアを計算
-            past_scores = list(
-                Game.objects.exclude(id=game_id)
-                .filter(score__gt=0)
-                .values_list("score", flat=True)
-            )
-            if past_scores:
-                z_score = GameCalculator.calculate_z_score(score, past_scores)
+            # 集計済みのスコア分布からZスコアを計算（ロックは取得しない）
+            distribution = ScoreStatistics.load_distribution()
+            if distribution.count:
+                z_score = GameCalculator.calculate_z_score_from_distribution(
+                    score, distribution
+                )
                 logger.info(f"Zスコア計算: z_score={z_score}")
             else:
                 # データがない場合のデフォルトZスコアは0（倍率=1.0）
@@ -221,6 +236,7 @@ class UpdateGameScore(graphene.Mutation):
             )
 
             # ユーザーの所持金を更新
+            old_gold = user.gold
             new_gold = user.gold + gold_change
             if new_gold < 0:
                 logger.warning(f"所持金が負になるため0に制限: user_id={user.id}")
@@ -230,17 +246,16 @@ class UpdateGameScore(graphene.Mutation):
             user.save()
             logger.info(f"所持金更新: new_gold={user.gold}")
 
-            # ランキングの更新（順位再計算をトリガ）
-            ranking, _ = Ranking.objects.get_or_create(user=user)
-            ranking.save()
-            try:
-                from app.models.user import User as UserModel
-
-                UserModel.update_rankings()
-                logger.info("ランキング一括更新完了")
-            except Exception:
-                # 失敗しても処理は継続
-                logger.warning("ランキング一括更新に失敗しました")
+            # スコア分布に今回のスコアを反映（シャードの行ロックを短くするため最後に行う）
+            ScoreStatistics.record_score(score)
+            logger.info("スコア統計更新")
+
+            gold_delta = user.gold - old_gold
+            transaction.on_commit(lambda: metrics.record_score_submitted(gold_delta))
+
+            # ランキングの一括再計算を予約（コミット後にデバウンスして実行）
+            transaction.on_commit(schedule_rankings_recompute)
+            logger.info("ランキング一括更新を予約")
 
             return UpdateGameScore(game=game, success=True, errors=[])
 
@@ -2,7 +2,9 @@ import logging
 
 import graphene
 from app.models.ranking import Ranking
+from app.utils import leaderboard_cache
 from app.utils.constants import RankingErrorMessages
+from app.utils.dataloaders import load_related, load_related_many
 from app.utils.errors import BaseError
 from graphene_django.types import DjangoObjectType
 
@@ -36,16 +38,19 @@ class RankingType(DjangoObjectType):
     gold = graphene.Int()
 
     def resolve_name(self, info):
-        logger.debug(f"ユーザー名取得: user_id={self.user.id}")
-        return self.user.name
+        user = load_related(self, "user", info)
+        logger.debug(f"ユーザー名取得: user_id={user.id}")
+        return user.name
 
     def resolve_icon(self, info):
-        logger.debug(f"ユーザーアイコン取得: user_id={self.user.id}")
-        return self.user.icon
+        user = load_related(self, "user", info)
+        logger.debug(f"ユーザーアイコン取得: user_id={user.id}")
+        return user.icon
 
     def resolve_gold(self, info):
-        logger.debug(f"ユーザー所持金取得: user_id={self.user.id}")
-        return self.user.gold
+        user = load_related(self, "user", info)
+        logger.debug(f"ユーザー所持金取得: user_id={user.id}")
+        return user.gold
 
 
 class Query(graphene.ObjectType):
@@ -64,22 +69,22 @@ class Query(graphene.ObjectType):
                     details=["limitは1以上、offsetは0以上である必要があります"],
                 )
 
-            # ランキングの取得（アクティブユーザーのみ）
+            # ランキングの取得（アクティブユーザーのみ、キャッシュ優先）
             try:
-                rankings = Ranking.objects.filter(user__is_active=True)
-                total_count = rankings.count()
-                logger.info(f"総ランキング数（アクティブユーザー）: {total_count}")
-
-                # ページネーション
-                result = rankings[offset : offset + limit]
+                result = leaderboard_cache.get_page(limit, offset)
                 logger.info(f"取得ランキング数: {len(result)}")
 
+                # ページ内のユーザー参照を1回のINクエリでまとめて解決
+                # （キャッシュから復元したページはユーザーを保持しているため取得しない）
+                load_related_many(result, "user", info)
+
                 for ranking in result:
+                    user = ranking.user
                     logger.info(
                         f"ランキング情報: rank={ranking.ranking}, "
-                        f"user_id={ranking.user.id}, "
-                        f"name={ranking.user.name}, "
-                        f"gold={ranking.user.gold}"
+                        f"user_id={user.id}, "
+                        f"name={user.name}, "
+                        f"gold={user.gold}"
                     )
 
                 return result
@@ -0,0 +1,15 @@
+"""gunicorn 設定（start.sh から --config で読み込む）"""
+
+import os
+
+
+def child_exit(server, worker):
+    """終了したワーカーのメトリクスファイルを集計対象から外す
+
+    カウンターとヒストグラムの値は終了後も集計に残り、
+    ワーカー単位のゲージのみが削除される。
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
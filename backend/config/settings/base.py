@@ -64,10 +64,27 @@ INSTALLED_APPS = [
 GRAPHENE = {
     "SCHEMA": "app.schema.schema",
     "MIDDLEWARE": [
-        "app.utils.jwt_middleware.JWTAuthenticationMiddleware",
+        # JWT認証は JWTAuthenticationMiddleware（Djangoミドルウェア）で
+        # GraphQLの実行前に済ませ、ユーザー単位でレート制限を行う
+        "app.utils.graphql_throttling.RateLimitMiddleware",
+        # ミューテーションの処理時間（レート制限による拒否を含む）
+        "app.utils.metrics.MutationMetricsMiddleware",
     ],
 }
 
+# GraphQLの計測設定（操作・リゾルバー単位の処理時間とSQL件数、既定は無効）
+GRAPHQL_METRICS_ENABLED = (
+    os.environ.get("GRAPHQL_METRICS_ENABLED", "False").lower() == "true"
+)
+GRAPHQL_METRICS_RESOLVER_DEPTH = int(
+    os.environ.get("GRAPHQL_METRICS_RESOLVER_DEPTH", 2)
+)
+GRAPHQL_METRICS_MAX_KEYS = int(os.environ.get("GRAPHQL_METRICS_MAX_KEYS", 200))
+if GRAPHQL_METRICS_ENABLED:
+    # 末尾のミドルウェアが最も外側で実行される
+    # （レート制限による拒否もエラーとして記録される）
+    GRAPHENE["MIDDLEWARE"].append("app.utils.graphql_metrics.InstrumentationMiddleware")
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -75,6 +92,8 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Bearer トークンによる認証（セッション認証の後に request.user を上書き）
+    "app.utils.jwt_middleware.JWTAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -110,6 +129,26 @@ DATABASES = {
     }
 }
 
+# Cache
+# default: ワーカー単位のキャッシュ（共有する必要のない値）
+# shared: 全ワーカーで共有するキャッシュ
+#   （ランキングページ・レート制限のカウンター・認証情報・MeCab設定）
+#   既定はDBキャッシュ（python manage.py createcachetable でテーブルを作成）。
+#   Redis / Memcached を使う場合は SHARED_CACHE_BACKEND / SHARED_CACHE_LOCATION を指定
+#   （DBキャッシュの incr は原子的ではないため、本番では Redis / Memcached を推奨）
+SHARED_CACHE_ALIAS = "shared"
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    SHARED_CACHE_ALIAS: {
+        "BACKEND": os.environ.get(
+            "SHARED_CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"
+        ),
+        "LOCATION": os.environ.get("SHARED_CACHE_LOCATION", "shared_cache"),
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -159,6 +198,17 @@ AUTH_USER_MODEL = "app.User"
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-pro")
 
+# AIテキスト生成の並列実行設定（GEMINI_MODEL=stub でオフラインのスタブモデルを使用）
+TEXT_GENERATION_PROMPT_COUNT = int(os.environ.get("TEXT_GENERATION_PROMPT_COUNT", 4))
+TEXT_GENERATION_CONCURRENCY = int(os.environ.get("TEXT_GENERATION_CONCURRENCY", 2))
+TEXT_GENERATION_TIMEOUT_SECONDS = float(
+    os.environ.get("TEXT_GENERATION_TIMEOUT_SECONDS", 60)
+)
+TEXT_GENERATION_MAX_RETRIES = int(os.environ.get("TEXT_GENERATION_MAX_RETRIES", 2))
+TEXT_GENERATION_RETRY_BACKOFF_SECONDS = float(
+    os.environ.get("TEXT_GENERATION_RETRY_BACKOFF_SECONDS", 2)
+)
+
 # メール設定
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = os.environ.get("EMAIL_HOST", "smtp.gmail.com")
@@ -176,3 +226,78 @@ FRONTEND_VERIFY_EMAIL_PATH = os.environ.get(
 FRONTEND_RESET_PASSWORD_PATH = os.environ.get(
     "FRONTEND_RESET_PASSWORD_PATH", "/reset-password"
 )
+
+# スコア分布スナップショット設定（練習モード用・プロセス内キャッシュ）
+SCORE_SNAPSHOT_MAX_AGE_SECONDS = int(
+    os.environ.get("SCORE_SNAPSHOT_MAX_AGE_SECONDS", 300)
+)
+SCORE_SNAPSHOT_REFRESH_INTERVAL_SECONDS = int(
+    os.environ.get("SCORE_SNAPSHOT_REFRESH_INTERVAL_SECONDS", 60)
+)
+
+# ランキング一括再計算設定（ゴールド変動が続く間は1回にまとめる）
+RANKING_RECOMPUTE_DEBOUNCE_SECONDS = int(
+    os.environ.get("RANKING_RECOMPUTE_DEBOUNCE_SECONDS", 5)
+)
+RANKING_RECOMPUTE_LOCK_SECONDS = int(
+    os.environ.get("RANKING_RECOMPUTE_LOCK_SECONDS", 60)
+)
+
+# ランキングページキャッシュ設定
+LEADERBOARD_CACHE_FRESH_SECONDS = int(
+    os.environ.get("LEADERBOARD_CACHE_FRESH_SECONDS", 30)
+)
+LEADERBOARD_CACHE_STALE_SECONDS = int(
+    os.environ.get("LEADERBOARD_CACHE_STALE_SECONDS", 300)
+)
+LEADERBOARD_CACHE_STALE_WHILE_REVALIDATE = (
+    os.environ.get("LEADERBOARD_CACHE_STALE_WHILE_REVALIDATE", "True").lower() == "true"
+)
+
+# TextPair配信プール設定（ワーカー単位のメモリ内バッファ）
+TEXT_PAIR_POOL_MAX_SIZE = int(os.environ.get("TEXT_PAIR_POOL_MAX_SIZE", 3000))
+TEXT_PAIR_POOL_MAX_BYTES = int(
+    os.environ.get("TEXT_PAIR_POOL_MAX_BYTES", 8 * 1024 * 1024)
+)
+TEXT_PAIR_POOL_REFILL_THRESHOLD = int(
+    os.environ.get("TEXT_PAIR_POOL_REFILL_THRESHOLD", 300)
+)
+TEXT_PAIR_POOL_MAX_AGE_SECONDS = int(
+    os.environ.get("TEXT_PAIR_POOL_MAX_AGE_SECONDS", 600)
+)
+
+# スケジューラーの適応モード設定（文章プールの残量に応じて生成・変換ジョブを起動）
+SCHEDULER_ADAPTIVE = os.environ.get("SCHEDULER_ADAPTIVE", "False").lower() == "true"
+SCHEDULER_ADAPTIVE_CHECK_SECONDS = int(
+    os.environ.get("SCHEDULER_ADAPTIVE_CHECK_SECONDS", 60)
+)
+TEXT_POOL_LOW_WATER_MARK = int(os.environ.get("TEXT_POOL_LOW_WATER_MARK", 3000))
+TEXT_POOL_HIGH_WATER_MARK = int(os.environ.get("TEXT_POOL_HIGH_WATER_MARK", 30000))
+TEXT_POOL_GENERATION_INTERVAL_SECONDS = int(
+    os.environ.get("TEXT_POOL_GENERATION_INTERVAL_SECONDS", 600)
+)
+TEXT_POOL_URGENT_GENERATION_INTERVAL_SECONDS = int(
+    os.environ.get("TEXT_POOL_URGENT_GENERATION_INTERVAL_SECONDS", 120)
+)
+TEXT_POOL_CONVERSION_THRESHOLD = int(
+    os.environ.get("TEXT_POOL_CONVERSION_THRESHOLD", 100)
+)
+
+# レート制限のワーカー内カウンター設定（shared キャッシュへの同期をまとめる）
+# SYNC_BATCH=1 で毎回同期（正確さ優先）、大きくするほどキャッシュへの問い合わせが減る
+THROTTLE_LOCAL_TIER_ENABLED = (
+    os.environ.get("THROTTLE_LOCAL_TIER_ENABLED", "True").lower() == "true"
+)
+THROTTLE_LOCAL_SYNC_BATCH = int(os.environ.get("THROTTLE_LOCAL_SYNC_BATCH", 4))
+THROTTLE_LOCAL_SYNC_INTERVAL_SECONDS = float(
+    os.environ.get("THROTTLE_LOCAL_SYNC_INTERVAL_SECONDS", 1.0)
+)
+THROTTLE_LOCAL_NEAR_LIMIT_RATIO = float(
+    os.environ.get("THROTTLE_LOCAL_NEAR_LIMIT_RATIO", 0.5)
+)
+
+# JWT認証キャッシュ設定（トークンの有効期限を超えない範囲でキャッシュ）
+JWT_PRINCIPAL_CACHE_SECONDS = int(os.environ.get("JWT_PRINCIPAL_CACHE_SECONDS", 300))
+
+# JWT認証のみを使用するパス（トークンがない場合はセッションがあっても匿名ユーザー）
+JWT_AUTH_PATH_PREFIXES = ["/graphql/"]
@@ -20,7 +20,14 @@ from django.urls import path
 from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
-from django.http import HttpResponseNotAllowed
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotAllowed,
+    JsonResponse,
+)
+from app.utils import graphql_metrics, metrics
 from app.views.auth.email_verification import verify_email_view
 
 
@@ -32,13 +39,46 @@ def graphql_view(request, *args, **kwargs):
         return HttpResponseNotAllowed(["POST"])
 
     view = GraphQLView.as_view(graphiql=settings.DEBUG)
-    return view(request, *args, **kwargs)
+    if not graphql_metrics.is_enabled():
+        return view(request, *args, **kwargs)
+    with graphql_metrics.track_operation(request) as stats:
+        response = view(request, *args, **kwargs)
+        # 構文・検証エラーはリゾルバーに到達しないため応答のステータスで判定
+        stats.failed = stats.failed or response.status_code >= 400
+        return response
+
+
+def graphql_metrics_view(request):
+    """GraphQLの計測結果（ワーカー単位）を返す。管理者のみ参照可能。
+    GRAPHQL_METRICS_ENABLED=False の場合は 404 を返す。
+    """
+    if not graphql_metrics.is_enabled():
+        raise Http404
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not getattr(request.user, "is_staff", False):
+        return HttpResponseForbidden()
+    return JsonResponse(graphql_metrics.graphql_metrics.snapshot())
+
+
+def metrics_view(request):
+    """Prometheus 形式のメトリクス（全ワーカーの集計）を返す。
+    バックエンドは公開されていないため認証は行わない（内部ネットワークから取得）。
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    body, content_type = metrics.render_latest()
+    return HttpResponse(body, content_type=content_type)
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     # GraphiQL は DEBUG=True のとき GET 許可、それ以外は POST のみ
     path("graphql/", csrf_exempt(graphql_view)),
+    # GraphQLの計測結果（GRAPHQL_METRICS_ENABLED=True のときのみ）
+    path("graphql/metrics/", graphql_metrics_view),
+    # Prometheus 形式のメトリクス
+    path("metrics/", metrics_view),
     # メール確認用エンドポイント
     path("verify-email/<str:token>/", verify_email_view, name="verify_email"),
 ]
@@ -2,16 +2,24 @@
 """
 TypeAndBet Django管理コマンド用のスケジューラー
 APSchedulerを使用してcronジョブを実行します
+
+Djangoは起動時に1度だけ初期化し、管理コマンドはプロセス内のスレッドで
+call_command により実行します（ジョブごとにPythonを起動しない）。
 """
 
+import io
 import logging
 import os
-import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
 
+from apscheduler.executors.pool import ThreadPoolExecutor as SchedulerThreadPoolExecutor
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
 # ログ設定
 logging.basicConfig(
@@ -24,18 +32,68 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ジョブのデフォルトタイムアウト（秒）
+DEFAULT_JOB_TIMEOUT = 300
+
+# 管理コマンドを実行するスレッド数
+JOB_WORKERS = 4
+
+
+class JobLogStream(io.TextIOBase):
+    """管理コマンドの出力を1行ごとにジョブのログファイルとロガーへ書き出すストリーム
+
+    出力をメモリに溜めず、実行中でもログを追えるようにする。
+    """
+
+    def __init__(self, log_file, job_name: str, level: int = logging.INFO):
+        self.log_file = log_file
+        self.job_name = job_name
+        self.level = level
+        self._pending = ""
+        self._lock = threading.Lock()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        with self._lock:
+            self._pending += text
+            *lines, self._pending = self._pending.split("\n")
+            for line in lines:
+                self._emit(line)
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._emit(self._pending)
+                self._pending = ""
+
+    def _emit(self, line: str) -> None:
+        self.log_file.write(line + "\n")
+        self.log_file.flush()
+        if line.strip():
+            logger.log(self.level, f"[{self.job_name}] {line}")
+
 
 class DjangoJobScheduler:
     def __init__(self):
-        self.scheduler = BlockingScheduler()
+        self.scheduler = BlockingScheduler(
+            executors={"default": SchedulerThreadPoolExecutor(JOB_WORKERS)},
+            # 実行中のジョブと重ならないよう、同一ジョブは1インスタンスまで
+            job_defaults={"max_instances": 1, "coalesce": True},
+        )
         self.app_dir = "/app"
-        # 環境に応じてPythonパスを設定
-        # 本番環境: /opt/venv/bin/python, 開発環境: python (システムのpython)
-        if os.path.exists("/opt/venv/bin/python"):
-            self.python_path = "/opt/venv/bin/python"
-        else:
-            self.python_path = "python"
         self.django_env_file = "/tmp/django_env"
+        # 管理コマンドを実行するスレッドプール（タイムアウト監視のため分離）
+        self.command_executor = ThreadPoolExecutor(
+            max_workers=JOB_WORKERS, thread_name_prefix="django-job"
+        )
+        # タイムアウト後もスレッドは止められないため、終了するまで再実行しない
+        self._running_jobs = set()
+        self._running_lock = threading.Lock()
+        # 適応モードの判断（setup_jobs で設定から作成）
+        self.pool_policy = None
 
     def load_environment(self):
         """環境変数ファイルを読み込み"""
@@ -52,69 +110,194 @@ class DjangoJobScheduler:
         else:
             logger.warning(f"環境変数ファイルが見つかりません: {self.django_env_file}")
 
-    def run_django_command(self, command_args, job_name):
-        """Django管理コマンドを実行"""
+    def setup_django(self):
+        """Djangoを初期化（スケジューラー起動時に1度だけ）"""
+        os.chdir(self.app_dir)
+        if self.app_dir not in sys.path:
+            sys.path.insert(0, self.app_dir)
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+        import django
+
+        django.setup()
+        logger.info("Djangoを初期化しました")
+
+    def _execute_command(self, command_args, log_file, job_name, recorder):
+        """ワーカースレッドで管理コマンドを実行"""
+        from django.core.management import call_command
+        from django.db import connections
+
+        from app.utils.job_runs import use_recorder
+
+        stdout = JobLogStream(log_file, job_name)
+        stderr = JobLogStream(log_file, job_name, level=logging.ERROR)
+        try:
+            # コマンド側の記録（処理件数・失敗）もこの実行履歴に集約される
+            with use_recorder(recorder):
+                call_command(*command_args, stdout=stdout, stderr=stderr)
+        finally:
+            stdout.flush()
+            stderr.flush()
+            # スレッドごとのDB接続を次回まで保持しない
+            connections.close_all()
+
+    def _release_job(self, job_name, log_file):
+        with self._running_lock:
+            self._running_jobs.discard(job_name)
+        log_file.close()
+
+    def run_django_command(self, command_args, job_name, timeout=DEFAULT_JOB_TIMEOUT):
+        """Django管理コマンドをプロセス内で実行"""
+        from django.db import connections
+
+        from app.utils.constants import JobRunConstants
+        from app.utils.job_runs import JobRunRecorder
+
+        with self._running_lock:
+            is_running = job_name in self._running_jobs
+            if not is_running:
+                self._running_jobs.add(job_name)
+        if is_running:
+            logger.warning(f"{job_name} ジョブは実行中のためスキップします")
+            JobRunRecorder.record_skipped(
+                job_name,
+                JobRunConstants.SOURCE_SCHEDULER,
+                "前回の実行が完了していません",
+            )
+            connections.close_all()
+            return
+
+        recorder = JobRunRecorder(job_name, source=JobRunConstants.SOURCE_SCHEDULER)
+
+        log_file = None
         try:
             logger.info(f"{job_name} ジョブを開始します")
 
-            # 作業ディレクトリを変更
-            os.chdir(self.app_dir)
+            log_file = open(f"/app/logs/{job_name}.log", "a", encoding="utf-8")
+            log_file.write(
+                f"\n=== {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n"
+            )
+            log_file.flush()
 
-            # コマンド実行
-            cmd = [self.python_path, "/app/manage.py"] + command_args
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5分のタイムアウト
+            future = self.command_executor.submit(
+                self._execute_command, command_args, log_file, job_name, recorder
             )
+            # 完了時に実行中フラグを解除（タイムアウト後に完了した場合も含む）
+            future.add_done_callback(lambda _: self._release_job(job_name, log_file))
 
-            # ログファイルに出力
-            log_file = f"/app/logs/{job_name}.log"
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(f"\n=== {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
-                f.write(f"Exit code: {result.returncode}\n")
-                if result.stdout:
-                    f.write(f"STDOUT:\n{result.stdout}\n")
-                if result.stderr:
-                    f.write(f"STDERR:\n{result.stderr}\n")
-                f.write("=" * 50 + "\n")
-
-            if result.returncode == 0:
-                logger.info(f"{job_name} ジョブが正常に完了しました")
-            else:
+            try:
+                future.result(timeout=timeout)
+                if recorder.failed:
+                    logger.error(
+                        f"{job_name} ジョブが失敗しました: {recorder.error_message}"
+                    )
+                else:
+                    logger.info(f"{job_name} ジョブが正常に完了しました")
+            except FutureTimeoutError:
+                recorder.mark_timeout()
                 logger.error(
-                    f"{job_name} ジョブが失敗しました (Exit code: {result.returncode})"
+                    f"{job_name} ジョブがタイムアウトしました（完了まで次回実行をスキップします）"
+                )
+            except Exception as e:
+                logger.error(
+                    f"{job_name} ジョブが失敗しました: {str(e)}", exc_info=True
                 )
 
-        except subprocess.TimeoutExpired:
-            logger.error(f"{job_name} ジョブがタイムアウトしました")
         except Exception as e:
             logger.error(f"{job_name} ジョブでエラーが発生しました: {str(e)}")
+            with self._running_lock:
+                self._running_jobs.discard(job_name)
+            if log_file is not None and not log_file.closed:
+                log_file.close()
+        finally:
+            # 実行履歴の更新に使った接続を保持しない
+            connections.close_all()
 
-    def setup_jobs(self):
-        """スケジュールジョブを設定"""
+    def _run_once(self, command_args, job_name):
+        """ジョブを即時に1回実行（スケジューラーのスレッドプールで実行）"""
+        self.scheduler.add_job(
+            func=self.run_django_command,
+            args=(command_args, job_name),
+            name=f"{job_name}（適応モード）",
+        )
+
+    def run_adaptive_check(self):
+        """文章プールの残量を確認し、必要な生成・変換ジョブを起動"""
+        from django.db import connections
+
+        from app.utils.text_pool_policy import get_pool_depth
+
+        try:
+            converted, unconverted = get_pool_depth()
+            decision = self.pool_policy.decide(converted, unconverted)
+            logger.info(
+                f"文章プール残量: converted={converted}, unconverted={unconverted}, "
+                f"state={decision.reason}, generate={decision.generate}, "
+                f"convert={decision.convert}"
+            )
+
+            if decision.generate:
+                command_args = ["generate_text_job", "--pipeline"]
+                if decision.urgent:
+                    # 枯渇しかけている場合は複数プロンプトを並列で生成
+                    command_args.append("--concurrent")
+                self._run_once(command_args, "generate_text_job")
+
+            if decision.convert:
+                self._run_once(["convert_hiragana_job"], "convert_hiragana_job")
 
-        # generate_text_job: 0,10,20,30,40,50分に実行
+        except Exception as e:
+            logger.error(f"文章プール残量の確認でエラーが発生しました: {str(e)}")
+        finally:
+            connections.close_all()
+
+    def setup_adaptive_jobs(self):
+        """適応モード: 一定間隔でプール残量を確認して生成・変換を起動"""
+        from django.conf import settings
+
+        from app.utils.text_pool_policy import TextPoolPolicy
+
+        self.pool_policy = TextPoolPolicy.from_settings()
+        self.scheduler.add_job(
+            func=self.run_adaptive_check,
+            trigger=IntervalTrigger(seconds=settings.SCHEDULER_ADAPTIVE_CHECK_SECONDS),
+            id="text_pool_check",
+            name="文章プール残量確認ジョブ",
+            replace_existing=True,
+        )
+
+    def setup_cron_jobs(self):
+        """固定スケジュールで生成・変換ジョブを設定"""
+
+        # generate_text_job: 0,10,20,30,40,50分に実行（生成と同時にひらがな化して保存）
         self.scheduler.add_job(
             func=self.run_django_command,
             trigger=CronTrigger(minute="0,10,20,30,40,50"),
-            args=(["generate_text_job"], "generate_text_job"),
+            args=(["generate_text_job", "--pipeline"], "generate_text_job"),
             id="generate_text_job",
             name="AIテキスト生成ジョブ",
             replace_existing=True,
         )
 
-        # convert_hiragana_job: 5,15,25,35,45,55分に実行
+        # convert_hiragana_job: 毎時5分に実行（生成時に変換できなかった文章の補完用）
         self.scheduler.add_job(
             func=self.run_django_command,
-            trigger=CronTrigger(minute="5,15,25,35,45,55"),
+            trigger=CronTrigger(minute="5"),
             args=(["convert_hiragana_job"], "convert_hiragana_job"),
             id="convert_hiragana_job",
             name="ひらがな変換ジョブ",
             replace_existing=True,
         )
 
+    def setup_jobs(self):
+        """スケジュールジョブを設定"""
+        from django.conf import settings
+
+        if settings.SCHEDULER_ADAPTIVE:
+            self.setup_adaptive_jobs()
+        else:
+            self.setup_cron_jobs()
+
         # partition_textpairs: 毎日2:00に実行
         self.scheduler.add_job(
             func=self.run_django_command,
@@ -135,6 +318,7 @@ class DjangoJobScheduler:
         except KeyboardInterrupt:
             logger.info("スケジューラーを停止します")
             self.scheduler.shutdown()
+            self.command_executor.shutdown(wait=False, cancel_futures=True)
         except Exception as e:
             logger.error(f"スケジューラーでエラーが発生しました: {str(e)}")
             sys.exit(1)
@@ -147,21 +331,17 @@ def main():
     # スケジューラーを作成
     scheduler = DjangoJobScheduler()
 
-    # 環境変数を読み込み
+    # 環境変数を読み込み、Djangoを初期化
     scheduler.load_environment()
+    scheduler.setup_django()
 
     # ジョブを設定
     scheduler.setup_jobs()
 
     # 設定されたジョブを表示
     logger.info("設定されたジョブ:")
-    logger.info(
-        "  - AIテキスト生成ジョブ (ID: generate_text_job) - 0,10,20,30,40,50分に実行"
-    )
-    logger.info(
-        "  - ひらがな変換ジョブ (ID: convert_hiragana_job) - 5,15,25,35,45,55分に実行"
-    )
-    logger.info("  - テキストペア分割ジョブ (ID: partition_textpairs) - 毎日2:00に実行")
+    for job in scheduler.scheduler.get_jobs():
+        logger.info(f"  - {job.name} (ID: {job.id}) - {job.trigger}")
 
     # スケジューラーを開始
     logger.info("スケジューラーを開始します...")
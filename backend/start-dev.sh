@@ -33,6 +33,9 @@ if ! python manage.py migrate --noinput; then
 fi
 log "Migrations completed successfully"
 
+# 共有キャッシュ（DBキャッシュ使用時）のテーブル作成
+python manage.py createcachetable
+
 # ログディレクトリを作成
 mkdir -p /app/logs
 
@@ -39,6 +39,16 @@ if ! python manage.py migrate --noinput; then
 fi
 log "Migrations completed successfully"
 
+# 共有キャッシュ（DBキャッシュ使用時）のテーブル作成
+if ! python manage.py createcachetable; then
+    error_exit "Cache table creation failed"
+fi
+
+# メトリクスの保存先（全ワーカーの値を集計するため、起動時に前回分を削除）
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Pythonスケジューラーをバックグラウンドで起動
 log "Starting Python scheduler..."
 python scheduler.py &
@@ -47,6 +57,7 @@ SCHEDULER_PID=$!
 # Gunicorn起動
 log "Starting Gunicorn..."
 exec gunicorn config.wsgi:application \
+    --config config/gunicorn.py \
     --bind 0.0.0.0:8000 \
     --workers $(( $(nproc) * 2 + 1 )) \
     --worker-class sync \